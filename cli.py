@@ -4,39 +4,62 @@ Command-line interface for Photo Cleaner
 """
 
 import argparse
+import functools
+import os
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from colorama import Fore
 
-try:
-    from dropbox_client import setup_dropbox_app, create_dropbox_client
-    DROPBOX_AVAILABLE = True
-except ImportError:
-    DROPBOX_AVAILABLE = False
+# Raw ANSI escapes so the CLI doesn't need colorama unless running on Windows
+_RED = "\x1b[31m"
+_YELLOW = "\x1b[33m"
+_RESET = "\x1b[0m"
 
-try:
-    from onedrive_client import setup_onedrive_app, create_onedrive_client
-    ONEDRIVE_AVAILABLE = True
-except ImportError:
-    ONEDRIVE_AVAILABLE = False
+# YYYY-MM-DD, as accepted by --date-from / --date-to
+_YMD_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
 
-try:
-    from google_photos_client import setup_google_photos
-    from google_drive_photos import create_google_drive_photos_client
-    GOOGLE_PHOTOS_AVAILABLE = True
-except ImportError:
-    GOOGLE_PHOTOS_AVAILABLE = False
 
-from storage_provider import LocalStorageProvider, DropboxStorageProvider, GooglePhotosStorageProvider, OneDriveStorageProvider
+def _enable_windows_color():
+    """Enable ANSI escape handling on Windows consoles (no-op elsewhere)"""
+    if sys.platform == 'win32':
+        from colorama import just_fix_windows_console
+        just_fix_windows_console()
 
 
-def create_parser():
-    """Create and configure the argument parser"""
-    parser = argparse.ArgumentParser(
-        description='Group similar photos and delete duplicates to save disk space',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+def _try_import_dropbox():
+    """Lazily import the Dropbox client helpers, or return None if unavailable"""
+    try:
+        from dropbox_client import setup_dropbox_app, create_dropbox_client
+        return setup_dropbox_app, create_dropbox_client
+    except ImportError:
+        return None
+
+
+def _try_import_onedrive():
+    """Lazily import the OneDrive client helpers, or return None if unavailable"""
+    try:
+        from onedrive_client import setup_onedrive_app, create_onedrive_client
+        return setup_onedrive_app, create_onedrive_client
+    except ImportError:
+        return None
+
+
+def _try_import_google_photos():
+    """Lazily import the Google Photos client helpers, or return None if unavailable"""
+    try:
+        from google_photos_client import GOOGLE_PHOTOS_AVAILABLE, setup_google_photos
+        from google_drive_photos import GOOGLE_DRIVE_AVAILABLE, create_google_drive_photos_client
+    except ImportError:
+        return None
+    # The Google SDKs themselves are imported on first use, so check they are installed
+    if not (GOOGLE_PHOTOS_AVAILABLE and GOOGLE_DRIVE_AVAILABLE):
+        return None
+    return setup_google_photos, create_google_drive_photos_client
+
+
+# Usage examples shown at the end of --help
+_EPILOG = """
 Examples:
   # Preview mode (default - generates HTML report, no deletions)
   %(prog)s /path/to/photos
@@ -97,7 +120,25 @@ Examples:
 
   # Apply custom decisions from HTML report
   %(prog)s --dropbox --apply-decisions photo_decisions.json --execute
-        """
+"""
+
+# (args attribute, lazy loader, display name, install hint) for each --*-setup flag
+_SETUP_HANDLERS = (
+    ('dropbox_setup', _try_import_dropbox, "Dropbox",
+     "pip install dropbox"),
+    ('onedrive_setup', _try_import_onedrive, "OneDrive",
+     "pip install msal requests"),
+    ('google_photos_setup', _try_import_google_photos, "Google Photos",
+     "pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client"),
+)
+
+
+def create_parser():
+    """Create and configure the argument parser"""
+    parser = argparse.ArgumentParser(
+        description='Group similar photos and delete duplicates to save disk space',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG
     )
     
     # Positional arguments
@@ -225,6 +266,53 @@ Examples:
     return parser
 
 
+@functools.lru_cache(maxsize=1)
+def _get_parser():
+    """Return a shared argument parser, built on first use"""
+    return create_parser()
+
+
+def _parse_ymd(s: str) -> datetime:
+    """Parse a YYYY-MM-DD string without going through strptime"""
+    match = _YMD_RE.fullmatch(s)
+    if not match:
+        raise ValueError(f"Invalid date: {s!r}")
+    year, month, day = map(int, match.groups())
+    return datetime(year, month, day)
+
+
+def _fast_path(argv):
+    """
+    Build the namespace directly for the common `photocleaner <directory>` call
+    
+    Returns None when argv needs the full parser (any flags, or not exactly one
+    positional argument). Defaults must stay in sync with create_parser().
+    """
+    if len(argv) != 2 or argv[1].startswith('-'):
+        return None
+    
+    return argparse.Namespace(
+        directory=argv[1],
+        threshold=15,
+        execute=False,
+        interactive=False,
+        date_from=None,
+        date_to=None,
+        backup_dir=None,
+        dropbox=False,
+        dropbox_folder='',
+        dropbox_setup=False,
+        use_search_api=False,
+        onedrive=False,
+        onedrive_folder='',
+        onedrive_setup=False,
+        google_photos=False,
+        google_photos_album='',
+        google_photos_setup=False,
+        apply_decisions=None
+    )
+
+
 def validate_and_parse_dates(args):
     """Parse and validate date arguments"""
     date_from = None
@@ -232,33 +320,35 @@ def validate_and_parse_dates(args):
     
     if args.date_from:
         try:
-            date_from = datetime.strptime(args.date_from, "%Y-%m-%d")
+            date_from = _parse_ymd(args.date_from)
         except ValueError:
-            print(f"{Fore.RED}Error: Invalid --date-from format. Use YYYY-MM-DD")
-            sys.exit(1)
+            sys.exit(f"{_RED}Error: Invalid --date-from format. Use YYYY-MM-DD{_RESET}")
     
     if args.date_to:
         try:
-            date_to = datetime.strptime(args.date_to, "%Y-%m-%d")
+            date_to = _parse_ymd(args.date_to)
         except ValueError:
-            print(f"{Fore.RED}Error: Invalid --date-to format. Use YYYY-MM-DD")
-            sys.exit(1)
+            sys.exit(f"{_RED}Error: Invalid --date-to format. Use YYYY-MM-DD{_RESET}")
     
-    if date_from and date_to and date_from > date_to:
-        print(f"{Fore.RED}Error: --date-from must be before --date-to")
-        sys.exit(1)
+    if date_from is not None and date_to is not None and date_from > date_to:
+        sys.exit(f"{_RED}Error: --date-from must be before --date-to{_RESET}")
     
     return date_from, date_to
 
 
 def validate_paths(args):
     """Validate and convert file paths"""
-    backup_dir = Path(args.backup_dir).resolve() if args.backup_dir else None
-    decisions_file = Path(args.apply_decisions).resolve() if args.apply_decisions else None
+    # abspath is pure string normalisation; resolve() would stat every component
+    backup_dir = Path(os.path.abspath(args.backup_dir)) if args.backup_dir else None
+    decisions_file = None
     
-    if decisions_file and not decisions_file.exists():
-        print(f"{Fore.RED}Error: Decisions file not found: {decisions_file}")
-        sys.exit(1)
+    if args.apply_decisions:
+        decisions_path = os.path.abspath(args.apply_decisions)
+        try:
+            os.stat(decisions_path)
+        except OSError:  # Also a file or unreadable directory in the path, as exists() treated them
+            sys.exit(f"{_RED}Error: Decisions file not found: {decisions_path}{_RESET}")
+        decisions_file = Path(decisions_path)
     
     return backup_dir, decisions_file
 
@@ -268,16 +358,17 @@ def create_storage_provider(args):
     
     if args.dropbox:
         # Dropbox mode
-        if not DROPBOX_AVAILABLE:
-            print(f"{Fore.RED}Error: Dropbox integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install dropbox")
-            sys.exit(1)
+        dropbox_helpers = _try_import_dropbox()
+        if not dropbox_helpers:
+            sys.exit(f"{_RED}Error: Dropbox integration not available.{_RESET}\n"
+                     f"{_YELLOW}Install dependencies: pip install dropbox{_RESET}")
+        _, create_dropbox_client = dropbox_helpers
+        from storage_provider import DropboxStorageProvider
         
         # Authenticate
         dropbox_client = create_dropbox_client()
         if not dropbox_client:
-            print(f"{Fore.RED}Failed to authenticate with Dropbox")
-            sys.exit(1)
+            sys.exit(f"{_RED}Failed to authenticate with Dropbox{_RESET}")
         
         return DropboxStorageProvider(
             dropbox_client,
@@ -287,16 +378,17 @@ def create_storage_provider(args):
     
     elif args.onedrive:
         # OneDrive mode
-        if not ONEDRIVE_AVAILABLE:
-            print(f"{Fore.RED}Error: OneDrive integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install msal requests")
-            sys.exit(1)
+        onedrive_helpers = _try_import_onedrive()
+        if not onedrive_helpers:
+            sys.exit(f"{_RED}Error: OneDrive integration not available.{_RESET}\n"
+                     f"{_YELLOW}Install dependencies: pip install msal requests{_RESET}")
+        _, create_onedrive_client = onedrive_helpers
+        from storage_provider import OneDriveStorageProvider
         
         # Authenticate
         onedrive_client = create_onedrive_client()
         if not onedrive_client:
-            print(f"{Fore.RED}Failed to authenticate with OneDrive")
-            sys.exit(1)
+            sys.exit(f"{_RED}Failed to authenticate with OneDrive{_RESET}")
         
         return OneDriveStorageProvider(
             onedrive_client,
@@ -305,16 +397,17 @@ def create_storage_provider(args):
     
     elif args.google_photos:
         # Google Photos mode
-        if not GOOGLE_PHOTOS_AVAILABLE:
-            print(f"{Fore.RED}Error: Google Photos integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client")
-            sys.exit(1)
+        google_photos_helpers = _try_import_google_photos()
+        if not google_photos_helpers:
+            sys.exit(f"{_RED}Error: Google Photos integration not available.{_RESET}\n"
+                     f"{_YELLOW}Install dependencies: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client{_RESET}")
+        _, create_google_drive_photos_client = google_photos_helpers
+        from storage_provider import GooglePhotosStorageProvider
         
         # Authenticate
         google_photos_client = create_google_drive_photos_client()
         if not google_photos_client:
-            print(f"{Fore.RED}Failed to authenticate with Google Drive (for Photos)")
-            sys.exit(1)
+            sys.exit(f"{_RED}Failed to authenticate with Google Drive (for Photos){_RESET}")
         
         return GooglePhotosStorageProvider(
             google_photos_client,
@@ -323,38 +416,24 @@ def create_storage_provider(args):
     
     else:
         # Local filesystem mode
-        directory = Path(args.directory).resolve()
+        from storage_provider import LocalStorageProvider
+        directory = Path(os.path.abspath(args.directory))
         return LocalStorageProvider(directory=directory)
 
 
 def handle_setup_commands(args):
     """Handle setup commands and return True if a setup command was run"""
-    
-    # Show Dropbox setup if requested
-    if args.dropbox_setup:
-        if DROPBOX_AVAILABLE:
-            setup_dropbox_app()
-        else:
-            print(f"{Fore.RED}Dropbox integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install dropbox")
-        return True
-    
-    # Show OneDrive setup if requested
-    if args.onedrive_setup:
-        if ONEDRIVE_AVAILABLE:
-            setup_onedrive_app()
-        else:
-            print(f"{Fore.RED}OneDrive integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install msal requests")
-        return True
-    
-    # Show Google Photos setup if requested
-    if args.google_photos_setup:
-        if GOOGLE_PHOTOS_AVAILABLE:
-            setup_google_photos()
+    for attr, loader, name, install_cmd in _SETUP_HANDLERS:
+        if not getattr(args, attr):
+            continue
+        
+        helpers = loader()
+        if helpers:
+            setup_fn = helpers[0]
+            setup_fn()
         else:
-            print(f"{Fore.RED}Google Photos integration not available.")
-            print(f"{Fore.YELLOW}Install dependencies: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client")
+            print(f"{_RED}{name} integration not available.{_RESET}")
+            print(f"{_YELLOW}Install dependencies: {install_cmd}{_RESET}")
         return True
     
     return False
@@ -362,8 +441,10 @@ def handle_setup_commands(args):
 
 def parse_args():
     """Parse command-line arguments and return configuration"""
-    parser = create_parser()
-    args = parser.parse_args()
+    args = _fast_path(sys.argv)
+    if args is None:
+        args = _get_parser().parse_args()
+    _enable_windows_color()
     
     # Handle setup commands (exit after if handled)
     if handle_setup_commands(args):
@@ -373,8 +454,9 @@ def parse_args():
     date_from, date_to = validate_and_parse_dates(args)
     backup_dir, decisions_file = validate_paths(args)
     
-    # Determine dry-run mode
-    dry_run = not (args.execute or args.interactive)
+    # Determine dry-run mode (--interactive implies --execute)
+    interactive = args.interactive
+    dry_run = not (interactive or args.execute)
     
     # Create storage provider
     storage = create_storage_provider(args)
@@ -384,7 +466,7 @@ def parse_args():
         'storage': storage,
         'threshold': args.threshold,
         'dry_run': dry_run,
-        'interactive': args.interactive,
+        'interactive': interactive,
         'backup_dir': backup_dir,
         'date_from': date_from,
         'date_to': date_to,
@@ -3,27 +3,261 @@ Dropbox Integration for Photo Cleaner
 Allows direct cleanup of photos in Dropbox cloud storage
 """
 
-import json
+import asyncio
+import hashlib
+import os
+import queue
+import random
+import re
 import tempfile
+import threading
+import time
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 import dropbox
+import numpy as np
+import requests
 from dropbox import DropboxOAuth2FlowNoRedirect
-from dropbox.exceptions import AuthError, ApiError
+from dropbox.exceptions import AuthError, ApiError, InternalServerError, RateLimitError
 from colorama import Fore
 
+# orjson is optional: a faster JSON codec for the listing cache and config
+try:
+    import orjson
+    
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+    
+    def _loads(data: bytes):
+        return orjson.loads(data)
+except ImportError:
+    import json
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    
+    def _loads(data: bytes):
+        return json.loads(data)
+
+# Concurrent Search API requests (kept well under Dropbox's rate limit)
+SEARCH_MAX_WORKERS = 8
+
+# Entries requested per files_list_folder page (the API maximum)
+LIST_PAGE_SIZE = 2000
+
+# Listing pages fetched ahead of the page currently being filtered
+LIST_PREFETCH_PAGES = 2
+
+# Image file extensions (lowercase, without the dot) picked up by the listings
+IMAGE_EXTS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'heic', 'heif'})
+
+# Extensions queried one by one through the Search API (the common camera formats)
+SEARCH_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.heic', '.heif')
+
+# Seconds a cached refresh token is trusted without a users_get_current_account probe
+AUTH_PROBE_TTL = 300
+
+# Folder that "deleted" photos are moved into
+TRASH_FOLDER = '/PhotoCleaner_Deleted'
+
+# Dropbox accepts at most 1000 entries per delete/move batch job
+BATCH_MAX_ENTRIES = 1000
+
+# Seconds between status checks of an asynchronous batch job
+BATCH_POLL_INTERVAL = 1.0
+
+# Bytes read from the network / written to disk at a time when downloading
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Concurrent downloads in download_photos (also the HTTP connection pool size)
+DOWNLOAD_MAX_WORKERS = 8
+
+# Upper bound on download requests started per second (Dropbox allows ~100/s)
+DOWNLOAD_MAX_REQUESTS_PER_SECOND = 100
+
+# Seconds before a cached folder listing is discarded and the folder fully rescanned
+LISTING_CACHE_TTL = 3600
+
+# Attempts per API call before a transient error is raised, and the backoff base in seconds
+RETRY_MAX_TRIES = 5
+RETRY_BASE_DELAY = 1.0
+
+# Dates accepted by list_photos (YYYY-MM-DD)
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Search API date clause, keyed by (date_from given, date_to given)
+_DATE_QUERY_TEMPLATES = {
+    (True, True): " modified:{date_from}..{date_to}",
+    (True, False): " modified:{date_from}..",
+    (False, True): " modified:..{date_to}",
+    (False, False): "",
+}
+
+# Marks the end of a prefetched listing
+_END_OF_LISTING = object()
+
+# Failures where the request may or may not have reached Dropbox
+_NETWORK_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class PhotoInfo:
+    """
+    Metadata for a single Dropbox photo
+    
+    A __slots__ class keeps large listings compact. It also supports the
+    read-only mapping access (photo['path'], photo.get('name'), 'id' in photo)
+    that the rest of the code uses for provider photo metadata.
+    """
+    
+    __slots__ = ('id', 'name', 'path', 'size', 'modified', 'media_info')
+    
+    def __init__(self, id: str, name: str, path: str, size: int, modified: datetime, media_info=None):
+        self.id = id
+        self.name = name
+        self.path = path
+        self.size = size
+        self.modified = modified
+        self.media_info = media_info
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def keys(self):
+        return self.__slots__
+    
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"PhotoInfo(name={self.name!r}, path={self.path!r}, size={self.size})"
+
+
+def _atomic_write(path: Path, data: bytes):
+    """
+    Write a private (0600) file via a temp file and os.replace
+    
+    A crash mid-write leaves the previous file intact, and readers never see
+    a partially written one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o600)  # Secure permissions
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _retry(fn, *args, max_tries: int = RETRY_MAX_TRIES, idempotent: bool = True, **kwargs):
+    """
+    Call fn, retrying transient failures with exponential backoff and jitter
+    
+    Retries server errors, rate limiting (waiting at least as long as Dropbox
+    asks) and dropped connections. Anything else, including ApiError and
+    AuthError, is raised immediately.
+    
+    Pass idempotent=False for calls that change files: a delete or move may
+    have been applied before its connection dropped, and repeating it would
+    fail with not_found, reporting a completed change as a failure. Those
+    calls are not retried on network errors.
+    """
+    for attempt in range(max_tries):
+        try:
+            return fn(*args, **kwargs)
+        except (InternalServerError, RateLimitError) + _NETWORK_ERRORS as e:
+            if attempt == max_tries - 1 or (not idempotent and isinstance(e, _NETWORK_ERRORS)):
+                raise
+            delay = RETRY_BASE_DELAY * 2 ** attempt + random.uniform(0, RETRY_BASE_DELAY)
+            if isinstance(e, RateLimitError) and e.backoff is not None:
+                delay = max(delay, e.backoff)
+            time.sleep(delay)
+
+
+@dataclass
+class PhotoListing:
+    """
+    Column-oriented (structure-of-arrays) view of a photo listing
+    
+    Every column has one element per photo, in the same order, so sizes and
+    dates can be sorted, compared and searched with NumPy instead of Python loops.
+    """
+    ids: List[str]
+    names: List[str]
+    paths: List[str]
+    sizes: np.ndarray     # int64, bytes
+    modified: np.ndarray  # datetime64[s], NaT when unknown
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @classmethod
+    def from_photos(cls, photos: List[PhotoInfo]) -> 'PhotoListing':
+        return cls(
+            ids=[photo.id for photo in photos],
+            names=[photo.name for photo in photos],
+            paths=[photo.path for photo in photos],
+            sizes=np.fromiter((photo.size for photo in photos), dtype=np.int64, count=len(photos)),
+            modified=np.array([photo.modified for photo in photos], dtype='datetime64[s]')
+        )
+
+
+def _photo_to_cache(photo: PhotoInfo) -> Dict:
+    """Convert a PhotoInfo to a JSON-serialisable dict"""
+    data = photo.to_dict()
+    if data['modified'] is not None:
+        data['modified'] = data['modified'].isoformat()
+    return data
+
+
+def _photo_from_cache(data: Dict) -> PhotoInfo:
+    """Inverse of _photo_to_cache"""
+    modified = data.get('modified')
+    return PhotoInfo(
+        data['id'],
+        data['name'],
+        data['path'],
+        data['size'],
+        datetime.fromisoformat(modified) if modified is not None else None,
+        data.get('media_info')
+    )
+
 
 class DropboxClient:
     """Client for interacting with Dropbox"""
     
-    def __init__(self, app_key: str, app_secret: str, refresh_token: Optional[str] = None):
+    def __init__(self, app_key: str, app_secret: str, refresh_token: Optional[str] = None,
+                 last_validated: float = 0.0):
         self.app_key = app_key
         self.app_secret = app_secret
         self.refresh_token = refresh_token
+        self.last_validated = last_validated  # Epoch seconds the token last worked
+        self._probe_skipped = False  # Authenticated from cache without testing the token
         self.dbx = None
-        self.cache_file = Path.home() / '.photocleaner_dropbox_cache.json'
+        self._trash_folder_ready = False  # Set once the trash folder is known to exist
+        # Verbose [DEBUG] output (per-file listings, diagnostics) is opt-in
+        self.debug = os.environ.get('PHOTOCLEANER_DEBUG') == '1'
+        self.cache_file = Path.home() / '.photocleaner_dropbox_cache'
+        self.listing_cache_file = Path.home() / '.photocleaner_dropbox_listings.json'
         
     def authenticate(self) -> bool:
         """
@@ -35,18 +269,24 @@ class DropboxClient:
         # Try to use cached refresh token
         if self.refresh_token:
             try:
-                self.dbx = dropbox.Dropbox(
-                    app_key=self.app_key,
-                    app_secret=self.app_secret,
-                    oauth2_refresh_token=self.refresh_token
-                )
-                # Test the connection
-                self.dbx.users_get_current_account()
+                self.dbx = self._connect()
+                # Test the connection, unless the token was confirmed working very recently
+                # (list_photos then signs in again if the token turns out to be revoked)
+                self._probe_skipped = time.time() - self.last_validated < AUTH_PROBE_TTL
+                if not self._probe_skipped:
+                    _retry(self.dbx.users_get_current_account)
+                    self._mark_validated()
                 print(f"{Fore.GREEN}Successfully authenticated from cache!")
                 return True
             except AuthError:
                 print(f"{Fore.YELLOW}Cached credentials expired, re-authenticating...")
         
+        return self._sign_in()
+    
+    def _sign_in(self) -> bool:
+        """Run the interactive OAuth flow and cache the new refresh token"""
+        self._probe_skipped = False
+        
         # Start OAuth flow
         auth_flow = DropboxOAuth2FlowNoRedirect(
             self.app_key,
@@ -76,17 +316,17 @@ class DropboxClient:
         
         try:
             oauth_result = auth_flow.finish(auth_code)
+            if oauth_result.refresh_token != self.refresh_token:
+                # Possibly a different account: its cursors would continue the old account's listings
+                self.listing_cache_file.unlink(missing_ok=True)
             self.refresh_token = oauth_result.refresh_token
+            self.last_validated = time.time()
             
             # Save refresh token to cache
             self._save_cache()
             
             # Create Dropbox client
-            self.dbx = dropbox.Dropbox(
-                app_key=self.app_key,
-                app_secret=self.app_secret,
-                oauth2_refresh_token=self.refresh_token
-            )
+            self.dbx = self._connect()
             
             print(f"{Fore.GREEN}Successfully authenticated!")
             return True
@@ -95,35 +335,60 @@ class DropboxClient:
             print(f"{Fore.RED}Authentication failed: {e}")
             return False
     
+    def _connect(self) -> dropbox.Dropbox:
+        """Create a Dropbox SDK client with a connection pool sized for parallel downloads"""
+        return dropbox.Dropbox(
+            app_key=self.app_key,
+            app_secret=self.app_secret,
+            oauth2_refresh_token=self.refresh_token,
+            session=dropbox.create_session(max_connections=DOWNLOAD_MAX_WORKERS),
+            # Retries are handled by _retry, so the SDK shouldn't retry as well
+            max_retries_on_error=0,
+            max_retries_on_rate_limit=0
+        )
+    
+    def _mark_validated(self):
+        """Record that the token just worked, so the next run can skip the probe"""
+        self.last_validated = time.time()
+        self._save_cache()
+    
     def _save_cache(self):
         """Save refresh token to cache"""
         try:
-            cache_data = {
-                'app_key': self.app_key,
-                'app_secret': self.app_secret,
-                'refresh_token': self.refresh_token
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f)
-            self.cache_file.chmod(0o600)  # Secure permissions
+            # One value per line; the schema is fixed, so no JSON needed
+            cache_data = f"{self.app_key}\n{self.app_secret}\n{self.refresh_token or ''}\n{self.last_validated!r}\n"
+            _atomic_write(self.cache_file, cache_data.encode())
         except Exception as e:
             print(f"{Fore.YELLOW}Warning: Could not save cache: {e}")
     
     @staticmethod
     def _load_cache() -> Optional[Dict]:
         """Load cached credentials"""
-        cache_file = Path.home() / '.photocleaner_dropbox_cache.json'
+        cache_file = Path.home() / '.photocleaner_dropbox_cache'
         if cache_file.exists():
             try:
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+                app_key, app_secret, refresh_token, last_validated = cache_file.read_text().split('\n')[:4]
+                return {
+                    'app_key': app_key,
+                    'app_secret': app_secret,
+                    'refresh_token': refresh_token or None,
+                    'last_validated': float(last_validated)
+                }
+            except Exception:
+                pass
+        
+        # Fall back to the JSON cache written by older versions
+        legacy_cache_file = Path.home() / '.photocleaner_dropbox_cache.json'
+        if legacy_cache_file.exists():
+            try:
+                return _loads(legacy_cache_file.read_bytes())
             except Exception:
                 pass
         return None
     
     def list_photos(self, folder_path: str = '', recursive: bool = True, 
                     date_from: Optional[str] = None, date_to: Optional[str] = None,
-                    use_search_api: bool = False) -> List[Dict]:
+                    use_search_api: bool = False) -> List[PhotoInfo]:
         """
         List photos in Dropbox folder
         
@@ -135,109 +400,111 @@ class DropboxClient:
             use_search_api: If True, uses Dropbox Search API (experimental), else uses list+filter
         
         Returns:
-            List of photo metadata dicts
+            List of PhotoInfo records (usable like read-only metadata dicts)
+        
+        Raises:
+            ValueError: If a date is not in YYYY-MM-DD format (checked before any request)
         """
+        try:
+            photos = self._list_photos(folder_path, recursive, date_from, date_to, use_search_api)
+        except AuthError:
+            # authenticate() trusted a recently validated token without testing it
+            if not self._probe_skipped:
+                raise
+            print(f"\n{Fore.YELLOW}Cached Dropbox credentials are no longer valid (revoked?), signing in again...")
+            self.refresh_token = None
+            if not self._sign_in():
+                raise
+            photos = self._list_photos(folder_path, recursive, date_from, date_to, use_search_api)
+        
+        # A successful listing proves the token works as well as the probe would
+        self._probe_skipped = False
+        self._mark_validated()
+        return photos
+    
+    def _list_photos(self, folder_path: str, recursive: bool, date_from: Optional[str],
+                     date_to: Optional[str], use_search_api: bool) -> List[PhotoInfo]:
+        """list_photos, without the re-authentication fallback"""
+        for date in (date_from, date_to):
+            if date and not _DATE_RE.fullmatch(date):
+                raise ValueError(f"Invalid date {date!r}, expected YYYY-MM-DD")
+        
         # If date filtering requested, choose the method
         if date_from or date_to:
             if use_search_api:
-                print(f"{Fore.YELLOW}[DEBUG] Using SEARCH API approach (experimental)")
+                if self.debug:
+                    print(f"{Fore.YELLOW}[DEBUG] Using SEARCH API approach (experimental)")
                 return self._list_photos_with_search_api(folder_path, date_from, date_to)
             else:
-                print(f"{Fore.YELLOW}[DEBUG] Using LIST+FILTER approach (reliable)")
+                if self.debug:
+                    print(f"{Fore.YELLOW}[DEBUG] Using LIST+FILTER approach (reliable)")
                 return self._list_photos_with_date_filter(folder_path, date_from, date_to)
         
         # Otherwise use regular listing
         return self._list_photos_standard(folder_path, recursive)
     
-    def _list_photos_with_search_api(self, folder_path: str, date_from: Optional[str], date_to: Optional[str]) -> List[Dict]:
+    def list_photos_soa(self, *args, **kwargs) -> PhotoListing:
+        """
+        Same as list_photos, but returned as parallel column arrays
+        
+        Takes the same arguments as list_photos.
+        """
+        return PhotoListing.from_photos(self.list_photos(*args, **kwargs))
+    
+    def _list_photos_with_search_api(self, folder_path: str, date_from: Optional[str], date_to: Optional[str]) -> List[PhotoInfo]:
         """
         List photos using Dropbox Search API (EXPERIMENTAL - for debugging)
         """
         print(f"{Fore.CYAN}Fetching photos from Dropbox folder: {folder_path or 'root'}...")
         print(f"{Fore.GREEN}[SEARCH API] Attempting server-side date filtering")
-        print(f"{Fore.YELLOW}[DEBUG] Date range: {date_from} to {date_to}")
+        if self.debug:
+            print(f"{Fore.YELLOW}[DEBUG] Date range: {date_from} to {date_to}")
         
         photos = []
         
-        # Image extensions
-        image_extensions = ('.jpg', '.jpeg', '.png', '.heic', '.heif')  # Start with common ones
-        
         try:
             # Build date filter query
-            date_query = ""
-            if date_from and date_to:
-                date_query = f" modified:{date_from}..{date_to}"
-            elif date_from:
-                date_query = f" modified:{date_from}.."
-            elif date_to:
-                date_query = f" modified:..{date_to}"
+            template = _DATE_QUERY_TEMPLATES[(bool(date_from), bool(date_to))]
+            date_query = template.format(date_from=date_from, date_to=date_to)
             
-            print(f"{Fore.YELLOW}[DEBUG] Date query string: '{date_query}'")
+            if self.debug:
+                print(f"{Fore.YELLOW}[DEBUG] Date query string: '{date_query}'")
             
             # Try different search approaches
             print(f"{Fore.CYAN}[SEARCH API] Method 1: Searching by extension with date filter...")
-            
-            # Search for each image type
-            for ext in image_extensions:
-                query = f"*.{ext.lstrip('.')}{date_query}"
-                print(f"{Fore.CYAN}[DEBUG] Query: '{query}'")
+            if self.debug:
                 print(f"{Fore.CYAN}[DEBUG] Path restriction: '{folder_path or '(none - searching all)'}'")
+            
+            # Search every extension concurrently; each task walks its own pagination
+            workers = min(SEARCH_MAX_WORKERS, len(SEARCH_EXTENSIONS))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    (ext, executor.submit(self._search_extension, ext, date_query, folder_path))
+                    for ext in SEARCH_EXTENSIONS
+                ]
                 
-                try:
-                    options = dropbox.files.SearchOptions(
-                        path=folder_path if folder_path else None,
-                        max_results=1000,
-                        file_status=dropbox.files.FileStatus.active,
-                        filename_only=False
-                    )
-                    
-                    print(f"{Fore.CYAN}  Searching for {ext} files...", end='', flush=True)
-                    result = self.dbx.files_search_v2(query, options=options)
+                # Report in submission order so output and result order stay deterministic
+                for ext, future in futures:
+                    try:
+                        ext_photos = future.result()
+                    except ApiError as e:
+                        print(f"\n{Fore.RED}[DEBUG] Search failed for {ext}: {e}")
+                        print(f"{Fore.RED}[DEBUG] Error details: {e.error}")
+                        continue
                     
-                    print(f" found {len(result.matches)} matches")
-                    print(f"{Fore.YELLOW}[DEBUG] Has more: {result.has_more}")
-                    
-                    for match in result.matches:
-                        metadata = match.metadata.get_metadata()
-                        
-                        if isinstance(metadata, dropbox.files.FileMetadata):
-                            photo_info = {
-                                'id': metadata.id,
-                                'name': metadata.name,
-                                'path': metadata.path_display,
-                                'size': metadata.size,
-                                'modified': metadata.client_modified,
-                                'media_info': None
-                            }
-                            photos.append(photo_info)
-                            print(f"{Fore.GREEN}[DEBUG]   - {metadata.name} (modified: {metadata.client_modified})")
-                    
-                    # Handle pagination
-                    while result.has_more:
-                        result = self.dbx.files_search_continue_v2(result.cursor)
-                        print(f"{Fore.CYAN}  Continuation found {len(result.matches)} more matches")
-                        
-                        for match in result.matches:
-                            metadata = match.metadata.get_metadata()
-                            if isinstance(metadata, dropbox.files.FileMetadata):
-                                photo_info = {
-                                    'id': metadata.id,
-                                    'name': metadata.name,
-                                    'path': metadata.path_display,
-                                    'size': metadata.size,
-                                    'modified': metadata.client_modified,
-                                    'media_info': None
-                                }
-                                photos.append(photo_info)
-                    
-                except ApiError as e:
-                    print(f"\n{Fore.RED}[DEBUG] Search failed for {ext}: {e}")
-                    print(f"{Fore.RED}[DEBUG] Error details: {e.error}")
+                    print(f"{Fore.CYAN}  {ext} files: found {len(ext_photos)} matches")
+                    if self.debug and ext_photos:
+                        # One buffered write instead of a terminal write per match
+                        print('\n'.join(
+                            f"{Fore.GREEN}[DEBUG]   - {photo['name']} (modified: {photo['modified']})"
+                            for photo in ext_photos
+                        ))
+                    photos.extend(ext_photos)
             
             print(f"\n{Fore.GREEN}[SEARCH API] Total found: {len(photos)} photos")
             
             # If search returned nothing, try without date filter to see if it's the filter causing issues
-            if len(photos) == 0:
+            if len(photos) == 0 and self.debug:
                 print(f"{Fore.YELLOW}[DEBUG] No results with date filter. Testing without date filter...")
                 test_query = "*.jpg"
                 try:
@@ -247,7 +514,7 @@ class DropboxClient:
                         file_status=dropbox.files.FileStatus.active,
                         filename_only=False
                     )
-                    result = self.dbx.files_search_v2(test_query, options=options)
+                    result = _retry(self.dbx.files_search_v2, test_query, options=options)
                     print(f"{Fore.YELLOW}[DEBUG] Without date filter: found {len(result.matches)} .jpg files")
                     if len(result.matches) > 0:
                         print(f"{Fore.RED}[DEBUG] The date filter syntax might be the problem!")
@@ -257,18 +524,103 @@ class DropboxClient:
             
             return photos
             
+        except AuthError:
+            raise  # Handled by list_photos
         except Exception as e:
             print(f"\n{Fore.RED}[SEARCH API] Unexpected error: {e}")
             import traceback
             traceback.print_exc()
             return []
     
-    def _list_photos_with_date_filter(self, folder_path: str, date_from: Optional[str], date_to: Optional[str]) -> List[Dict]:
+    def _search_extension(self, ext: str, date_query: str, folder_path: str) -> List[PhotoInfo]:
+        """
+        Run a Search API query for a single extension, following pagination
+        
+        Safe to call from worker threads; prints nothing and lets ApiError propagate.
+        """
+        query = f"*.{ext.lstrip('.')}{date_query}"
+        options = dropbox.files.SearchOptions(
+            path=folder_path if folder_path else None,
+            max_results=1000,
+            file_status=dropbox.files.FileStatus.active,
+            filename_only=False
+        )
+        
+        photos = []
+        result = _retry(self.dbx.files_search_v2, query, options=options)
+        while True:
+            for match in result.matches:
+                metadata = match.metadata.get_metadata()
+                if isinstance(metadata, dropbox.files.FileMetadata):
+                    photos.append(PhotoInfo(metadata.id, metadata.name, metadata.path_display, metadata.size, metadata.client_modified))
+            
+            if not result.has_more:
+                return photos
+            result = _retry(self.dbx.files_search_continue_v2, result.cursor)
+    
+    def _iter_list_folder(self, folder_path: str, recursive: bool = True, cursor: Optional[str] = None):
+        """
+        Yield files_list_folder results page by page, prefetching ahead
+        
+        The cursor is serial, so a background thread follows it while the caller
+        filters the current page, overlapping network latency with CPU work.
+        Errors raised while fetching are re-raised in the caller. If a saved
+        cursor is given, only the changes since that cursor are listed.
+        """
+        pages = queue.Queue(maxsize=LIST_PREFETCH_PAGES)
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            # Give up if the consumer has gone away instead of blocking forever
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def fetch_pages():
+            try:
+                if cursor is None:
+                    # Only id/name/path/size/client_modified are used, so skip media info
+                    result = _retry(
+                        self.dbx.files_list_folder,
+                        folder_path,
+                        recursive=recursive,
+                        include_media_info=False,
+                        include_non_downloadable_files=False,
+                        limit=LIST_PAGE_SIZE
+                    )
+                else:
+                    result = _retry(self.dbx.files_list_folder_continue, cursor)
+                while put(result) and result.has_more:
+                    result = _retry(self.dbx.files_list_folder_continue, result.cursor)
+            except Exception as e:
+                put(e)
+                return
+            put(_END_OF_LISTING)
+        
+        fetcher = threading.Thread(target=fetch_pages, name='dropbox-list-prefetch', daemon=True)
+        fetcher.start()
+        
+        try:
+            while True:
+                item = pages.get()
+                if item is _END_OF_LISTING:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+    
+    def _list_photos_with_date_filter(self, folder_path: str, date_from: Optional[str], date_to: Optional[str]) -> List[PhotoInfo]:
         """
         List photos with date filtering using efficient client-side filtering
         (Dropbox search API has limitations, so we filter during listing)
         """
-        from datetime import datetime as dt
+        from datetime import datetime as dt, timedelta
         
         print(f"{Fore.CYAN}Fetching photos from Dropbox folder: {folder_path or 'root'}...")
         print(f"{Fore.YELLOW}Filtering by date: {date_from} to {date_to}")
@@ -278,59 +630,38 @@ class DropboxClient:
         date_from_dt = dt.strptime(date_from, '%Y-%m-%d') if date_from else None
         date_to_dt = dt.strptime(date_to, '%Y-%m-%d') if date_to else None
         
+        # Half-open [lo, hi) bounds so client_modified can be compared without
+        # stripping its time component (hi is midnight after date_to)
+        lo = date_from_dt
+        hi = date_to_dt + timedelta(days=1) if date_to_dt else None
+        
         photos = []
         skipped = 0
-        has_more = True
-        cursor = None
-        batch_count = 0
         
-        # Image extensions to look for
-        image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.heic', '.heif')
+        # Local alias; the SDK returns leaf types, so an identity check is enough
+        FileMetadata = dropbox.files.FileMetadata
         
         try:
-            while has_more:
-                batch_count += 1
-                
-                if cursor is None:
-                    print(f"{Fore.CYAN}Scanning batch 1...", end='', flush=True)
-                    result = self.dbx.files_list_folder(folder_path, recursive=True)
-                else:
+            print(f"{Fore.CYAN}Scanning batch 1...", end='', flush=True)
+            for batch_count, result in enumerate(self._iter_list_folder(folder_path, recursive=True), 1):
+                if batch_count > 1:
                     print(f"\r{Fore.CYAN}Scanning batch {batch_count}... Found {len(photos)} matching photos, skipped {skipped}", end='', flush=True)
-                    result = self.dbx.files_list_folder_continue(cursor)
                 
                 for entry in result.entries:
                     # Check if it's a file (not a folder)
-                    if isinstance(entry, dropbox.files.FileMetadata):
-                        # Check if it's an image
-                        if entry.name.lower().endswith(image_extensions):
+                    if type(entry) is FileMetadata:
+                        # Check if it's an image (only the extension is lowercased)
+                        _, dot, ext = entry.name.rpartition('.')
+                        if dot and ext.lower() in IMAGE_EXTS:
                             # Filter by date
                             file_date = entry.client_modified
-                            
-                            # Strip time for comparison
-                            file_date_only = file_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                            
-                            # Check if within date range
-                            if date_from_dt and file_date_only < date_from_dt:
-                                skipped += 1
-                                continue
-                            
-                            if date_to_dt and file_date_only > date_to_dt:
+                            if (lo is not None and file_date < lo) or (hi is not None and file_date >= hi):
                                 skipped += 1
                                 continue
                             
                             # Passed date filter, add to list
-                            photo_info = {
-                                'id': entry.id,
-                                'name': entry.name,
-                                'path': entry.path_display,
-                                'size': entry.size,
-                                'modified': entry.client_modified,
-                                'media_info': None
-                            }
+                            photo_info = PhotoInfo(entry.id, entry.name, entry.path_display, entry.size, entry.client_modified)
                             photos.append(photo_info)
-                
-                has_more = result.has_more
-                cursor = result.cursor if has_more else None
             
             print(f"\r{Fore.GREEN}✓ Found {len(photos)} photos matching date range (skipped {skipped} outside range)                    ")
             return photos
@@ -339,128 +670,314 @@ class DropboxClient:
             print(f"\n{Fore.RED}Error fetching photos: {e}")
             return []
     
-    def _list_photos_standard(self, folder_path: str, recursive: bool) -> List[Dict]:
+    def _list_photos_standard(self, folder_path: str, recursive: bool, use_cache: bool = True) -> List[PhotoInfo]:
         """
         Standard photo listing (used when no date filter or as fallback)
+        
+        The result and the final list_folder cursor are cached on disk, so later
+        runs only fetch the changes since the previous scan. A full rescan is
+        forced once the cache is older than LISTING_CACHE_TTL seconds.
         """
         print(f"{Fore.CYAN}Fetching photos from Dropbox folder: {folder_path or 'root'}...")
-        print(f"{Fore.YELLOW}This may take a moment for large folders...")
         
-        photos = []
-        has_more = True
-        cursor = None
-        batch_count = 0
+        cache_key = f"{self._account_key()}|{folder_path.lower()}|{'recursive' if recursive else 'flat'}"
+        listings = self._load_listing_cache()
+        cached = listings.get(cache_key) if use_cache else None
+        if cached and time.time() - cached.get('full_scan_at', 0) > LISTING_CACHE_TTL:
+            cached = None
+        
+        if cached:
+            print(f"{Fore.CYAN}Using cached listing, fetching changes since the last scan...")
+            photos_by_path = {
+                path_lower: _photo_from_cache(photo)
+                for path_lower, photo in cached['entries'].items()
+            }
+            cursor = cached['cursor']
+            full_scan_at = cached['full_scan_at']
+        else:
+            print(f"{Fore.YELLOW}This may take a moment for large folders...")
+            photos_by_path = {}
+            cursor = None
+            full_scan_at = time.time()
         
-        # Image extensions to look for
-        image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.heic', '.heif')
+        # Local aliases; the SDK returns leaf types, so identity checks are enough
+        FileMetadata = dropbox.files.FileMetadata
+        DeletedMetadata = dropbox.files.DeletedMetadata
         
         try:
-            while has_more:
-                batch_count += 1
-                
-                if cursor is None:
-                    print(f"{Fore.CYAN}Scanning Dropbox folder (batch 1)...", end='', flush=True)
-                    if recursive:
-                        result = self.dbx.files_list_folder(folder_path, recursive=True)
-                    else:
-                        result = self.dbx.files_list_folder(folder_path)
-                else:
-                    print(f"\r{Fore.CYAN}Scanning Dropbox folder (batch {batch_count})... {len(photos)} photos found so far", end='', flush=True)
-                    result = self.dbx.files_list_folder_continue(cursor)
+            print(f"{Fore.CYAN}Scanning Dropbox folder (batch 1)...", end='', flush=True)
+            for batch_count, result in enumerate(self._iter_list_folder(folder_path, recursive=recursive, cursor=cursor), 1):
+                if batch_count > 1:
+                    print(f"\r{Fore.CYAN}Scanning Dropbox folder (batch {batch_count})... {len(photos_by_path)} photos found so far", end='', flush=True)
                 
                 for entry in result.entries:
                     # Check if it's a file (not a folder)
-                    if isinstance(entry, dropbox.files.FileMetadata):
-                        # Check if it's an image
-                        if entry.name.lower().endswith(image_extensions):
-                            photo_info = {
-                                'id': entry.id,
-                                'name': entry.name,
-                                'path': entry.path_display,
-                                'size': entry.size,
-                                'modified': entry.client_modified,
-                                'media_info': None
-                            }
-                            
-                            # Try to get media info if available
-                            if hasattr(entry, 'media_info') and entry.media_info:
-                                if hasattr(entry.media_info, 'metadata'):
-                                    media = entry.media_info.metadata
-                                    if hasattr(media, 'time_taken'):
-                                        photo_info['photo_taken'] = media.time_taken
-                            
-                            photos.append(photo_info)
+                    if type(entry) is FileMetadata:
+                        # Check if it's an image (only the extension is lowercased)
+                        _, dot, ext = entry.name.rpartition('.')
+                        if dot and ext.lower() in IMAGE_EXTS:
+                            photo_info = PhotoInfo(entry.id, entry.name, entry.path_display, entry.size, entry.client_modified)
+                            photos_by_path[entry.path_lower] = photo_info
+                    
+                    elif type(entry) is DeletedMetadata:
+                        # Only seen in delta listings; a deleted folder removes everything under it
+                        deleted = entry.path_lower
+                        prefix = deleted + '/'
+                        for path_lower in [p for p in photos_by_path if p == deleted or p.startswith(prefix)]:
+                            del photos_by_path[path_lower]
                 
-                has_more = result.has_more
-                cursor = result.cursor if has_more else None
-            
-            print(f"\r{Fore.GREEN}✓ Found {len(photos)} photos in Dropbox                              ")
-            return photos
+                cursor = result.cursor
             
         except ApiError as e:
+            if cached and isinstance(e.error, dropbox.files.ListFolderContinueError) and e.error.is_reset():
+                print(f"\n{Fore.YELLOW}Cached listing is no longer valid, rescanning...")
+                return self._list_photos_standard(folder_path, recursive, use_cache=False)
             print(f"\n{Fore.RED}Error fetching photos: {e}")
             return []
+        
+        listings[cache_key] = {
+            'cursor': cursor,
+            'full_scan_at': full_scan_at,
+            'entries': {path_lower: _photo_to_cache(photo) for path_lower, photo in photos_by_path.items()}
+        }
+        self._save_listing_cache(listings)
+        
+        photos = list(photos_by_path.values())
+        print(f"\r{Fore.GREEN}✓ Found {len(photos)} photos in Dropbox                              ")
+        return photos
+    
+    def _account_key(self) -> str:
+        """
+        Identifies the credentials listings were fetched with
+        
+        list_folder cursors belong to one account, so cached listings must not
+        be continued after switching to another (the refresh token changes
+        whenever the user signs in again).
+        """
+        return hashlib.sha256(f"{self.app_key}|{self.refresh_token}".encode()).hexdigest()[:16]
+    
+    def _load_listing_cache(self) -> Dict:
+        """Load cached folder listings, keyed by account, folder and recursion mode"""
+        if self.listing_cache_file.exists():
+            try:
+                return _loads(self.listing_cache_file.read_bytes())
+            except Exception:
+                pass
+        return {}
+    
+    def _save_listing_cache(self, listings: Dict):
+        """Save cached folder listings, dropping any made with other credentials"""
+        prefix = self._account_key() + '|'
+        listings = {key: listing for key, listing in listings.items() if key.startswith(prefix)}
+        try:
+            _atomic_write(self.listing_cache_file, _dumps(listings))
+        except Exception as e:
+            print(f"{Fore.YELLOW}Warning: Could not save listing cache: {e}")
     
     def download_photo(self, path: str, local_path: Path) -> bool:
         """Download a photo to local path"""
         try:
-            metadata, response = self.dbx.files_download(path)
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
+            metadata, response = _retry(self.dbx.files_download, path)
+            # Stream to disk so memory use is bounded by the chunk size, not the photo size
+            with response, open(local_path, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
             return True
         except ApiError as e:
             print(f"{Fore.YELLOW}Warning: Failed to download {path}: {e}")
             return False
     
+    def download_photos(self, items: List[Tuple[str, Path]], workers: int = DOWNLOAD_MAX_WORKERS) -> List[bool]:
+        """
+        Download several photos concurrently
+        
+        Args:
+            items: (dropbox_path, local_path) pairs
+            workers: Number of downloads in flight at once
+        
+        Returns:
+            A success flag per item, in the same order as items
+        """
+        min_interval = 1.0 / DOWNLOAD_MAX_REQUESTS_PER_SECOND
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for path, local_path in items:
+                futures.append(executor.submit(self.download_photo, path, local_path))
+                # Pace request starts to stay under the API rate limit
+                time.sleep(min_interval)
+            return [future.result() for future in futures]
+    
     def delete_photo(self, path: str) -> bool:
         """Delete a photo from Dropbox"""
         try:
-            self.dbx.files_delete_v2(path)
+            _retry(self.dbx.files_delete_v2, path, idempotent=False)
             return True
         except ApiError as e:
             print(f"{Fore.YELLOW}Warning: Failed to delete {path}: {e}")
             return False
+        except _NETWORK_ERRORS as e:
+            print(f"{Fore.YELLOW}Warning: Connection lost while deleting {path}; it may or may not have been deleted: {e}")
+            return False
     
     def move_photo_to_trash(self, path: str) -> bool:
         """
         Move a photo to a 'PhotoCleaner_Deleted' folder
         """
         try:
-            # Ensure trash folder exists
-            trash_folder = '/PhotoCleaner_Deleted'
-            try:
-                self.dbx.files_create_folder_v2(trash_folder)
-            except ApiError as e:
-                # Folder might already exist, that's fine
-                if not e.error.is_path() or not e.error.get_path().is_conflict():
-                    raise
-            
-            # Get filename from path
-            filename = Path(path).name
-            new_path = f"{trash_folder}/{filename}"
+            self._ensure_trash_folder()
             
-            # Handle name conflicts by adding numbers
-            counter = 1
-            while True:
-                try:
-                    self.dbx.files_move_v2(path, new_path)
-                    return True
-                except ApiError as e:
-                    if e.error.is_to() and e.error.get_to().is_conflict():
-                        # File exists, try with a number
-                        stem = Path(filename).stem
-                        suffix = Path(filename).suffix
-                        new_path = f"{trash_folder}/{stem}_{counter}{suffix}"
-                        counter += 1
-                        if counter > 100:  # Safety limit
-                            print(f"{Fore.RED}Too many naming conflicts for {filename}")
-                            return False
-                    else:
-                        raise
+            # Name conflicts are resolved server-side ("name (1).jpg", ...)
+            new_path = f"{TRASH_FOLDER}/{Path(path).name}"
+            _retry(self.dbx.files_move_v2, path, new_path, autorename=True, idempotent=False)
+            return True
         
         except ApiError as e:
             print(f"{Fore.YELLOW}Warning: Failed to move {path} to trash: {e}")
             return False
+        except _NETWORK_ERRORS as e:
+            print(f"{Fore.YELLOW}Warning: Connection lost while moving {path} to trash; it may or may not have been moved: {e}")
+            return False
+    
+    def _ensure_trash_folder(self):
+        """Create the trash folder if it doesn't exist yet (at most once per client)"""
+        if self._trash_folder_ready:
+            return
+        try:
+            _retry(self.dbx.files_create_folder_v2, TRASH_FOLDER)
+        except ApiError as e:
+            # Folder might already exist, that's fine
+            if not e.error.is_path() or not e.error.get_path().is_conflict():
+                raise
+        self._trash_folder_ready = True
+    
+    def _wait_for_batch(self, launch, check_job):
+        """
+        Wait for a delete/move batch job and return its per-entry results
+        
+        Returns None if the job as a whole failed.
+        """
+        if launch.is_complete():
+            return launch.get_complete().entries
+        if not launch.is_async_job_id():
+            return None
+        
+        job_id = launch.get_async_job_id()
+        while True:
+            status = _retry(check_job, job_id)
+            if status.is_complete():
+                return status.get_complete().entries
+            if not status.is_in_progress():
+                return None
+            time.sleep(BATCH_POLL_INTERVAL)
+    
+    def delete_photos_batch(self, paths: List[str]) -> List[bool]:
+        """
+        Delete photos using Dropbox batch jobs (one request per 1000 paths)
+        
+        Returns:
+            A success flag per path, in the same order as paths
+        """
+        results = []
+        for start in range(0, len(paths), BATCH_MAX_ENTRIES):
+            chunk = paths[start:start + BATCH_MAX_ENTRIES]
+            try:
+                launch = _retry(self.dbx.files_delete_batch, [dropbox.files.DeleteArg(p) for p in chunk],
+                                idempotent=False)
+                entries = self._wait_for_batch(launch, self.dbx.files_delete_batch_check)
+            except ApiError as e:
+                print(f"{Fore.YELLOW}Warning: Batch delete failed: {e}")
+                entries = None
+            except _NETWORK_ERRORS as e:
+                print(f"{Fore.YELLOW}Warning: Connection lost during batch delete of {len(chunk)} photos; "
+                      f"some may have been deleted: {e}")
+                entries = None
+            
+            if entries is None:
+                results.extend([False] * len(chunk))
+            else:
+                results.extend(entry.is_success() for entry in entries)
+        return results
+    
+    def move_photos_to_trash_batch(self, paths: List[str]) -> List[bool]:
+        """
+        Move photos to the 'PhotoCleaner_Deleted' folder using Dropbox batch jobs
+        
+        Name conflicts are resolved server-side with autorename.
+        
+        Returns:
+            A success flag per path, in the same order as paths
+        """
+        if not paths:
+            return []
+        
+        try:
+            self._ensure_trash_folder()
+        except ApiError as e:
+            print(f"{Fore.YELLOW}Warning: Could not create trash folder: {e}")
+            return [False] * len(paths)
+        
+        results = []
+        for start in range(0, len(paths), BATCH_MAX_ENTRIES):
+            chunk = paths[start:start + BATCH_MAX_ENTRIES]
+            relocations = [
+                dropbox.files.RelocationPath(p, f"{TRASH_FOLDER}/{Path(p).name}")
+                for p in chunk
+            ]
+            try:
+                launch = _retry(self.dbx.files_move_batch_v2, relocations, autorename=True, idempotent=False)
+                entries = self._wait_for_batch(launch, self.dbx.files_move_batch_check_v2)
+            except ApiError as e:
+                print(f"{Fore.YELLOW}Warning: Batch move to trash failed: {e}")
+                entries = None
+            except _NETWORK_ERRORS as e:
+                print(f"{Fore.YELLOW}Warning: Connection lost during batch move of {len(chunk)} photos to trash; "
+                      f"some may have been moved: {e}")
+                entries = None
+            
+            if entries is None:
+                results.extend([False] * len(chunk))
+            else:
+                results.extend(entry.is_success() for entry in entries)
+        return results
+
+
+class DropboxAsyncClient:
+    """
+    asyncio front end for DropboxClient
+    
+    The Dropbox SDK is synchronous, so each call runs in a worker thread with
+    at most max_concurrency requests in flight. Async callers can overlap many
+    Dropbox requests without blocking the event loop; synchronous callers keep
+    using DropboxClient directly.
+    """
+    
+    def __init__(self, client: DropboxClient, max_concurrency: int = DOWNLOAD_MAX_WORKERS):
+        self.client = client
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _run(self, fn, *args, **kwargs):
+        async with self._semaphore:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+    
+    async def list_photos(self, *args, **kwargs) -> List[PhotoInfo]:
+        """Async version of DropboxClient.list_photos (same arguments)"""
+        return await self._run(self.client.list_photos, *args, **kwargs)
+    
+    async def download_photo(self, path: str, local_path: Path) -> bool:
+        """Async version of DropboxClient.download_photo"""
+        return await self._run(self.client.download_photo, path, local_path)
+    
+    async def download_photos(self, items: List[Tuple[str, Path]]) -> List[bool]:
+        """Download (dropbox_path, local_path) pairs concurrently; one flag per item"""
+        return list(await asyncio.gather(*(self.download_photo(path, local_path) for path, local_path in items)))
+    
+    async def delete_batch(self, paths: List[str]) -> List[bool]:
+        """Async version of DropboxClient.delete_photos_batch"""
+        return await self._run(self.client.delete_photos_batch, paths)
+    
+    async def move_to_trash_batch(self, paths: List[str]) -> List[bool]:
+        """Async version of DropboxClient.move_photos_to_trash_batch"""
+        return await self._run(self.client.move_photos_to_trash_batch, paths)
 
 
 def setup_dropbox_app():
@@ -500,7 +1017,7 @@ def load_dropbox_config() -> Optional[Dict]:
     config_file = Path('dropbox_config.json')
     if config_file.exists():
         try:
-            config = json.loads(config_file.read_text())
+            config = _loads(config_file.read_bytes())
             return config
         except Exception as e:
             print(f"{Fore.YELLOW}Warning: Could not load config: {e}")
@@ -524,12 +1041,13 @@ def create_dropbox_client() -> Optional[DropboxClient]:
     app_key = config.get('app_key')
     app_secret = config.get('app_secret')
     refresh_token = config.get('refresh_token')
+    last_validated = config.get('last_validated', 0.0)
     
     if not app_key or not app_secret:
         print(f"{Fore.RED}Missing app_key or app_secret in configuration")
         return None
     
-    client = DropboxClient(app_key, app_secret, refresh_token)
+    client = DropboxClient(app_key, app_secret, refresh_token, last_validated)
     if client.authenticate():
         return client
     
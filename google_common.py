@@ -0,0 +1,441 @@
+"""
+Shared helpers for the Google Drive and Google Photos clients
+"""
+
+import functools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from colorama import Fore
+
+# orjson is optional: a faster decoder for API response bodies
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTTP statuses treated as transient and retried
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Attempts per request before a transient error is raised, and the backoff base in seconds
+RETRY_MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1.0
+
+# Access tokens this close to expiry are refreshed before a long listing starts
+TOKEN_REFRESH_MARGIN = timedelta(minutes=10)
+
+# Minimum seconds between listing progress updates
+PROGRESS_INTERVAL = 0.5
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket
+    
+    Allows bursts of up to `burst` requests, then `rate` requests per second.
+    Callers wait for a token up front instead of running into 429 responses
+    and their much longer backoff delays.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, count: int = 1):
+        """Block until `count` requests may be sent"""
+        for _ in range(count):
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+
+
+class ProgressLine:
+    """
+    Listing progress shown on one terminal line, rewritten in place
+    
+    Updates arriving faster than `interval` are skipped (finish() still shows
+    the last one), so a long listing doesn't write a line per page.
+    """
+    
+    def __init__(self, interval: float = PROGRESS_INTERVAL):
+        self.interval = interval
+        self._message: Optional[str] = None
+        self._shown: Optional[str] = None
+        self._shown_at = float('-inf')
+    
+    def update(self, message: str):
+        self._message = message
+        now = time.monotonic()
+        if now - self._shown_at >= self.interval:
+            self._shown_at = now
+            self._show()
+    
+    def finish(self):
+        """Show the latest update if it was skipped, and end the line"""
+        if self._message is None:
+            return
+        if self._shown != self._message:
+            self._show()
+        print()
+        self._message = self._shown = None
+    
+    def _show(self):
+        print(f"\r{Fore.CYAN}{self._message}", end='', flush=True)
+        self._shown = self._message
+
+
+class PhotoMeta:
+    """
+    Metadata for a single Google Drive / Google Photos photo
+    
+    A __slots__ class keeps large listings compact. It also supports the
+    read-only mapping access (photo['id'], photo.get('filename')) that the
+    rest of the code uses for provider photo metadata.
+    """
+    
+    __slots__ = ('id', 'filename', 'url', 'mimeType', 'createdTime', 'size', 'width', 'height')
+    
+    def __init__(self, id: str, filename: str, url: str = '', mimeType: str = '', createdTime: str = '',
+                 size: int = 0, width: int = 0, height: int = 0):
+        self.id = id
+        self.filename = filename
+        self.url = url
+        self.mimeType = mimeType
+        self.createdTime = createdTime
+        self.size = size
+        self.width = width
+        self.height = height
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def keys(self):
+        return self.__slots__
+    
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"PhotoMeta(id={self.id!r}, filename={self.filename!r}, size={self.size})"
+
+
+@dataclass
+class PhotoMetaListing:
+    """
+    Column-oriented (structure-of-arrays) view of a Google photo listing
+    
+    Every column has one element per photo, in the same order, so sizes,
+    resolutions and dates can be sorted and filtered with NumPy instead of
+    Python loops.
+    """
+    ids: List[str]
+    filenames: List[str]
+    sizes: np.ndarray    # int64, bytes (0 when unknown)
+    widths: np.ndarray   # int32, pixels
+    heights: np.ndarray  # int32, pixels
+    created: np.ndarray  # datetime64[s] UTC, NaT when unknown
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @classmethod
+    def from_photos(cls, photos: List[PhotoMeta]) -> 'PhotoMetaListing':
+        count = len(photos)
+        # RFC 3339 UTC timestamps; NumPy parses them once the 'Z' is dropped
+        created = [photo.createdTime.rstrip('Z') or 'NaT' for photo in photos]
+        return cls(
+            ids=[photo.id for photo in photos],
+            filenames=[photo.filename for photo in photos],
+            sizes=np.fromiter((photo.size for photo in photos), dtype=np.int64, count=count),
+            widths=np.fromiter((photo.width for photo in photos), dtype=np.int32, count=count),
+            heights=np.fromiter((photo.height for photo in photos), dtype=np.int32, count=count),
+            created=np.array(created, dtype='datetime64[ms]').astype('datetime64[s]')
+        )
+
+
+def to_int(value) -> int:
+    """Convert an API number (often sent as a string) to int; missing or empty is 0"""
+    return int(value) if value else 0
+
+
+def transient_status(error: Exception) -> Optional[int]:
+    """HTTP status of a retryable googleapiclient or requests error, else None"""
+    resp = getattr(error, 'resp', None)  # googleapiclient HttpError
+    if resp is not None:
+        status = resp.status
+    else:
+        response = getattr(error, 'response', None)  # requests HTTPError
+        status = getattr(response, 'status_code', None)
+    return status if status in RETRY_STATUSES else None
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds the server asked us to wait (Retry-After header), or 0"""
+    headers = getattr(error, 'resp', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _connection_errors() -> tuple:
+    """
+    Dropped-connection and timeout exceptions of every installed HTTP stack
+    
+    requests and httplib2 raise their own types, which don't derive from the
+    builtin ConnectionError/TimeoutError. Imported only once an error occurs.
+    """
+    errors = [ConnectionError, TimeoutError]
+    try:
+        import requests
+        errors += [requests.exceptions.ConnectionError, requests.exceptions.Timeout]
+    except ImportError:
+        pass
+    try:
+        import httplib2
+        errors.append(httplib2.ServerNotFoundError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def call_with_retry(fn, *args, limiter: Optional[RateLimiter] = None,
+                    max_attempts: int = RETRY_MAX_ATTEMPTS, **kwargs):
+    """
+    Call fn (typically a request's execute), retrying transient failures
+    
+    Retries 429/5xx responses and dropped connections with jittered
+    exponential backoff, waiting at least as long as Retry-After asks.
+    Takes a token from limiter before every attempt.
+    """
+    for attempt in range(max_attempts):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except _connection_errors():
+            if attempt == max_attempts - 1:
+                raise
+            delay = RETRY_BASE_DELAY * 2 ** attempt
+        except Exception as e:
+            if transient_status(e) is None or attempt == max_attempts - 1:
+                raise
+            delay = max(_retry_after(e), RETRY_BASE_DELAY * 2 ** attempt)
+        time.sleep(delay + random.uniform(0, RETRY_BASE_DELAY))
+
+
+def json_model():
+    """
+    Response model for build(model=...) that parses JSON with orjson
+    
+    Returns None, i.e. googleapiclient's own JsonModel, when orjson isn't
+    installed.
+    """
+    if orjson is None:
+        return None
+    from googleapiclient.model import JsonModel
+    
+    class OrjsonModel(JsonModel):
+        def deserialize(self, content):
+            try:
+                body = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                return super().deserialize(content)
+            if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+                body = body['data']
+            return body
+    
+    return OrjsonModel()
+
+
+class _GoogleOAuthClient(ABC):
+    """
+    OAuth plumbing shared by the Google Drive and Google Photos clients
+    
+    Subclasses set the class attributes below and implement _build_service.
+    """
+    
+    SCOPES: List[str] = []
+    DISPLAY_NAME = 'Google'            # e.g. "Google Drive", used in messages
+    TOKEN_NAME = 'google'              # Token cache is ~/.photocleaner_<TOKEN_NAME>_token.json
+    MISSING_CREDENTIALS_HINT = ''      # Shown when the client credentials file is missing
+    AUTH_NOTES: Tuple[str, ...] = ()   # Shown before the browser sign-in
+    
+    def __init__(self):
+        self.service = None
+        self.creds = None
+        self.token_path = Path.home() / f'.photocleaner_{self.TOKEN_NAME}_token.json'
+        self.legacy_token_path = Path.home() / f'.photocleaner_{self.TOKEN_NAME}_token.pickle'
+    
+    @abstractmethod
+    def _build_service(self):
+        """Build the googleapiclient service for self.creds"""
+        pass
+    
+    def authenticate(self, credentials_file: str = 'google_photos_credentials.json') -> bool:
+        """
+        Authenticate with the Google API
+        
+        Args:
+            credentials_file: Path to OAuth 2.0 client credentials JSON file
+        
+        Returns:
+            True if authentication successful, False otherwise
+        """
+        if self.service:
+            return True  # Already connected
+        
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
+        creds_path = Path(credentials_file)
+        
+        if not creds_path.exists():
+            print(f"{Fore.RED}Error: {self.DISPLAY_NAME} credentials file not found: {credentials_file}")
+            print(f"{Fore.YELLOW}{self.MISSING_CREDENTIALS_HINT}")
+            return False
+        
+        # Check if we have cached credentials
+        if self.token_path.exists() or self.legacy_token_path.exists():
+            try:
+                self.creds = self._load_token()
+                
+                # Verify scopes match - if not, force re-authentication
+                if self.creds and hasattr(self.creds, 'scopes'):
+                    cached_scopes = set(self.creds.scopes) if self.creds.scopes else set()
+                    required_scopes = set(self.SCOPES)
+                    if cached_scopes != required_scopes:
+                        print(f"{Fore.YELLOW}Cached credentials have different scopes, re-authenticating...")
+                        self.creds = None
+            except Exception as e:
+                print(f"{Fore.YELLOW}Warning: Could not load cached credentials: {e}")
+                self.creds = None
+        
+        # If no valid credentials, authenticate
+        if not self.creds or not self.creds.valid:
+            if self.creds and self.creds.expired and self.creds.refresh_token:
+                try:
+                    print(f"{Fore.CYAN}Refreshing {self.DISPLAY_NAME} access token...")
+                    self.creds.refresh(Request())
+                except Exception as e:
+                    print(f"{Fore.YELLOW}Could not refresh token: {e}")
+                    self.creds = None
+            
+            if not self.creds:
+                try:
+                    print(f"{Fore.CYAN}Opening browser for {self.DISPLAY_NAME} authentication...")
+                    for note in self.AUTH_NOTES:
+                        print(f"{Fore.YELLOW}{note}")
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        str(creds_path), self.SCOPES)
+                    self.creds = flow.run_local_server(port=0)
+                except Exception as e:
+                    print(f"{Fore.RED}Authentication failed: {e}")
+                    return False
+            
+            # Save credentials for next time
+            try:
+                self._save_token(self.creds)
+                print(f"{Fore.GREEN}✓ Credentials cached for future use")
+            except Exception as e:
+                print(f"{Fore.YELLOW}Warning: Could not cache credentials: {e}")
+        
+        try:
+            self.service = self._build_service()
+            print(f"{Fore.GREEN}✓ Successfully connected to {self.DISPLAY_NAME}")
+            self._refresh_if_expiring()
+            return True
+        except Exception as e:
+            print(f"{Fore.RED}Failed to build {self.DISPLAY_NAME} service: {e}")
+            return False
+    
+    def _load_token(self):
+        """Load cached credentials, converting a token pickled by older versions to JSON"""
+        from google.oauth2.credentials import Credentials
+        
+        if self.token_path.exists():
+            return Credentials.from_authorized_user_info(json.loads(self.token_path.read_text()))
+        
+        import pickle
+        with open(self.legacy_token_path, 'rb') as token:
+            creds = pickle.load(token)
+        self._save_token(creds)
+        self.legacy_token_path.unlink()
+        return creds
+    
+    def _save_token(self, creds):
+        """
+        Write credentials to the token cache as private (0600) JSON
+        
+        The file holds a refresh token, so it is never world-readable, and it
+        is replaced atomically so an interrupted write can't corrupt it.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.token_path.parent, prefix=f"{self.token_path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(creds.to_json())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.token_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _refresh_if_expiring(self, progress: Optional[ProgressLine] = None):
+        """
+        Refresh the access token early if it expires within TOKEN_REFRESH_MARGIN
+        
+        Runs inline, before work is handed to worker threads (or between pages,
+        with no request in flight), so the credentials those threads share are
+        never swapped while one of them is reading them. A failure is reported
+        after ending progress's line, if one is being shown.
+        """
+        expiry = self.creds.expiry
+        if not expiry or not self.creds.refresh_token:
+            return
+        # google-auth keeps expiry as a naive UTC datetime
+        if expiry - datetime.now(timezone.utc).replace(tzinfo=None) >= TOKEN_REFRESH_MARGIN:
+            return
+        
+        from google.auth.transport.requests import Request
+        
+        try:
+            self.creds.refresh(Request())
+            self._save_token(self.creds)
+        except Exception as e:
+            if progress is not None:
+                progress.finish()
+            print(f"{Fore.YELLOW}Warning: Could not refresh access token early: {e}")
@@ -3,24 +3,27 @@ Google Drive API Client for accessing Google Photos
 Using Drive API as workaround for deprecated Photos Library API scopes
 """
 
+import importlib.util
 import json
 import os
-import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 from colorama import Fore
 
-try:
-    from google.auth.transport.requests import Request
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    GOOGLE_DRIVE_AVAILABLE = True
-except ImportError:
-    GOOGLE_DRIVE_AVAILABLE = False
+from google_common import (PhotoMeta, PhotoMetaListing, ProgressLine, RateLimiter, RETRY_BASE_DELAY,
+                           RETRY_MAX_ATTEMPTS, _GoogleOAuthClient, call_with_retry, json_model, to_int, transient_status)
+
+# The Google client libraries are slow to import, so they are imported where
+# they are used; this only checks that they are installed
+GOOGLE_DRIVE_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ('googleapiclient', 'google_auth_oauthlib', 'google_auth_httplib2')
+)
 
 
 # Scopes required for Google Drive (to access photos via Google Photos integration)
@@ -29,90 +32,57 @@ except ImportError:
 SCOPES = ['https://www.googleapis.com/auth/drive.photos.readonly',
           'https://www.googleapis.com/auth/drive']
 
+# Image MIME types listed by their own files.list query in list_photos;
+# every other image type comes from one catch-all query
+LIST_PARTITION_MIME_TYPES = ('image/jpeg', 'image/png', 'image/heic', 'image/heif', 'image/gif')
+
+# Files requested per files.list page (the API maximum)
+LIST_PAGE_SIZE = 1000
+
+# Partial response for files.list: only what list_photos returns
+LIST_FIELDS = 'nextPageToken, files(id, name, mimeType, createdTime, size, imageMediaMetadata(width, height))'
+
+# Deletes per batch HTTP request (larger Drive batches tend to fail with 500s)
+DELETE_BATCH_SIZE = 25
+
+# Concurrent files.list queries in list_photos (one per MIME type partition)
+LIST_MAX_WORKERS = len(LIST_PARTITION_MIME_TYPES) + 1
+
+# Bytes per media download request; large enough that any photo arrives in one request
+DOWNLOAD_CHUNK_SIZE = 100 * 1024 * 1024
+
+# Concurrent downloads in download_photos
+DOWNLOAD_MAX_WORKERS = 8
 
-class GoogleDrivePhotosClient:
+# Requests per second to Drive across all threads (with a short burst allowance)
+API_MAX_REQUESTS_PER_SECOND = 10
+API_BURST = 20
+
+
+
+# Shared by every client and worker thread in the process
+_rate_limiter = RateLimiter(API_MAX_REQUESTS_PER_SECOND, API_BURST)
+
+
+class GoogleDrivePhotosClient(_GoogleOAuthClient):
     """Client for accessing photos via Google Drive API"""
     
-    def __init__(self):
-        self.service = None
-        self.creds = None
-        self.token_path = Path.home() / '.photocleaner_drive_token.pickle'
+    SCOPES = SCOPES
+    DISPLAY_NAME = 'Google Drive'
+    TOKEN_NAME = 'drive'
+    MISSING_CREDENTIALS_HINT = 'Use the same credentials file from Google Photos setup'
+    AUTH_NOTES = ("Note: We're using Google Drive API to access your photos",
+                  "(Google Photos API scopes were deprecated in March 2025)")
     
-    def authenticate(self, credentials_file: str = 'google_photos_credentials.json') -> bool:
-        """
-        Authenticate with Google Drive
+    def _build_service(self):
+        from googleapiclient.discovery import build
         
-        Args:
-            credentials_file: Path to OAuth 2.0 client credentials JSON file
-        
-        Returns:
-            True if authentication successful, False otherwise
-        """
-        creds_path = Path(credentials_file)
-        
-        if not creds_path.exists():
-            print(f"{Fore.RED}Error: Google credentials file not found: {credentials_file}")
-            print(f"{Fore.YELLOW}Use the same credentials file from Google Photos setup")
-            return False
-        
-        # Check if we have cached credentials
-        if self.token_path.exists():
-            try:
-                with open(self.token_path, 'rb') as token:
-                    self.creds = pickle.load(token)
-                    
-                # Verify scopes match - if not, force re-authentication
-                if self.creds and hasattr(self.creds, 'scopes'):
-                    cached_scopes = set(self.creds.scopes) if self.creds.scopes else set()
-                    required_scopes = set(SCOPES)
-                    if cached_scopes != required_scopes:
-                        print(f"{Fore.YELLOW}Cached credentials have different scopes, re-authenticating...")
-                        self.creds = None
-            except Exception as e:
-                print(f"{Fore.YELLOW}Warning: Could not load cached credentials: {e}")
-                self.creds = None
-        
-        # If no valid credentials, authenticate
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                try:
-                    print(f"{Fore.CYAN}Refreshing Google Drive access token...")
-                    self.creds.refresh(Request())
-                except Exception as e:
-                    print(f"{Fore.YELLOW}Could not refresh token: {e}")
-                    self.creds = None
-            
-            if not self.creds:
-                try:
-                    print(f"{Fore.CYAN}Opening browser for Google Drive authentication...")
-                    print(f"{Fore.YELLOW}Note: We're using Google Drive API to access your photos")
-                    print(f"{Fore.YELLOW}(Google Photos API scopes were deprecated in March 2025)")
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        str(creds_path), SCOPES)
-                    self.creds = flow.run_local_server(port=0)
-                except Exception as e:
-                    print(f"{Fore.RED}Authentication failed: {e}")
-                    return False
-            
-            # Save credentials for next time
-            try:
-                with open(self.token_path, 'wb') as token:
-                    pickle.dump(self.creds, token)
-                print(f"{Fore.GREEN}✓ Credentials cached for future use")
-            except Exception as e:
-                print(f"{Fore.YELLOW}Warning: Could not cache credentials: {e}")
-        
-        try:
-            self.service = build('drive', 'v3', credentials=self.creds)
-            print(f"{Fore.GREEN}✓ Successfully connected to Google Drive")
-            return True
-        except Exception as e:
-            print(f"{Fore.RED}Failed to build Google Drive service: {e}")
-            return False
+        # Use the Drive discovery document bundled with googleapiclient (no download)
+        return build('drive', 'v3', credentials=self.creds, static_discovery=True, model=json_model())
     
     def list_photos(self, album_name: Optional[str] = None, 
                     date_from: Optional[str] = None, 
-                    date_to: Optional[str] = None) -> List[Dict]:
+                    date_to: Optional[str] = None) -> List[PhotoMeta]:
         """
         List photos from Google Drive (Google Photos storage)
         
@@ -122,7 +92,7 @@ class GoogleDrivePhotosClient:
             date_to: Optional end date (YYYY-MM-DD)
         
         Returns:
-            List of photo metadata dictionaries
+            List of PhotoMeta records (usable like read-only metadata dicts)
         """
         if not self.service:
             print(f"{Fore.RED}Not authenticated with Google Drive")
@@ -131,65 +101,40 @@ class GoogleDrivePhotosClient:
         if album_name:
             print(f"{Fore.YELLOW}Warning: Album filtering not supported with Drive API")
         
-        photos = []
-        
         try:
             print(f"{Fore.CYAN}Fetching photos from Google Drive...")
+            # Refresh before fanning out so worker threads don't all refresh mid-listing
+            self._refresh_if_expiring()
             
-            # Build query for image files
-            # mimeType contains 'image/' for all image types
-            query = "mimeType contains 'image/'"
+            # Skip trashed files server-side (they used to be listed, and
+            # "deleting" them again was a no-op)
+            filter_query = " and trashed = false"
             
             # Add date filter if provided
             if date_from:
-                query += f" and createdTime >= '{date_from}T00:00:00'"
+                filter_query += f" and createdTime >= '{date_from}T00:00:00'"
             if date_to:
-                query += f" and createdTime <= '{date_to}T23:59:59'"
+                filter_query += f" and createdTime <= '{date_to}T23:59:59'"
             
-            # Query for photos
-            page_token = None
-            batch_count = 0
+            # Drive page tokens are strictly sequential, so split the listing
+            # into disjoint MIME type queries and paginate them concurrently
+            others = ' and '.join(f"mimeType != '{mime}'" for mime in LIST_PARTITION_MIME_TYPES)
+            queries = [f"mimeType = '{mime}'" for mime in LIST_PARTITION_MIME_TYPES]
+            queries.append(f"mimeType contains 'image/' and {others}")
             
-            while True:
-                batch_count += 1
-                
-                try:
-                    results = self.service.files().list(
-                        q=query,
-                        spaces='drive',
-                        fields='nextPageToken, files(id, name, mimeType, createdTime, modifiedTime, size, imageMediaMetadata, webContentLink, thumbnailLink)',
-                        pageSize=100,
-                        pageToken=page_token
-                    ).execute()
-                    
-                    items = results.get('files', [])
-                    
-                    # Process items
-                    for item in items:
-                        metadata = item.get('imageMediaMetadata', {})
-                        
-                        photos.append({
-                            'id': item['id'],
-                            'filename': item.get('name', 'unknown'),
-                            'url': item.get('webContentLink', ''),
-                            'thumbnail': item.get('thumbnailLink', ''),
-                            'mimeType': item.get('mimeType', ''),
-                            'createdTime': item.get('createdTime', ''),
-                            'modifiedTime': item.get('modifiedTime', ''),
-                            'size': int(item.get('size', 0)),
-                            'width': int(metadata.get('width', 0)),
-                            'height': int(metadata.get('height', 0)),
-                        })
-                    
-                    print(f"{Fore.CYAN}Batch {batch_count}: Found {len(photos)} photos so far...")
-                    
-                    page_token = results.get('nextPageToken')
-                    if not page_token:
-                        break
-                        
-                except HttpError as e:
-                    print(f"{Fore.RED}Google Drive API error: {e}")
-                    break
+            progress = {'batches': 0, 'photos': 0, 'line': ProgressLine()}
+            progress_lock = threading.Lock()
+            
+            try:
+                with ThreadPoolExecutor(max_workers=LIST_MAX_WORKERS) as executor:
+                    futures = [
+                        executor.submit(self._list_partition, query + filter_query, progress, progress_lock)
+                        for query in queries
+                    ]
+                    # Collect in submission order so the result order is deterministic
+                    photos = [photo for future in futures for photo in future.result()]
+            finally:
+                progress['line'].finish()
             
             print(f"{Fore.GREEN}✓ Found {len(photos)} photos total")
             return photos
@@ -198,13 +143,87 @@ class GoogleDrivePhotosClient:
             print(f"{Fore.RED}Error listing photos: {e}")
             return []
     
-    def download_photo(self, photo_id: str, output_path: Path) -> bool:
+    def list_photos_soa(self, *args, **kwargs) -> PhotoMetaListing:
+        """
+        Same as list_photos, but returned as parallel column arrays
+        
+        Takes the same arguments as list_photos.
+        """
+        return PhotoMetaListing.from_photos(self.list_photos(*args, **kwargs))
+    
+    def _list_partition(self, query: str, progress: Dict, progress_lock: threading.Lock) -> List[PhotoMeta]:
+        """
+        Page through one files.list query (runs in a worker thread)
+        
+        httplib2 connections are not thread-safe, so each call gets its own
+        authorized Http. The next page is fetched in a lookahead thread while
+        the current one is processed; only one request uses the Http at a
+        time. On an API error the pages fetched so far are kept.
+        """
+        import google_auth_httplib2
+        import httplib2
+        from googleapiclient.errors import HttpError
+        
+        http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+        photos = []
+        
+        def fetch(page_token: Optional[str]) -> Dict:
+            request = self.service.files().list(
+                q=query,
+                spaces='drive',
+                fields=LIST_FIELDS,
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token
+            )
+            return call_with_retry(request.execute, http=http, limiter=_rate_limiter)
+        
+        with ThreadPoolExecutor(max_workers=1) as fetcher:
+            future = fetcher.submit(fetch, None)
+            while future:
+                try:
+                    results = future.result()
+                except HttpError as e:
+                    with progress_lock:
+                        progress['line'].finish()
+                        print(f"{Fore.RED}Google Drive API error: {e}")
+                    break
+                
+                page_token = results.get('nextPageToken')
+                future = fetcher.submit(fetch, page_token) if page_token else None
+                
+                items = results.get('files', [])
+                
+                # Process items
+                append = photos.append
+                for item in items:
+                    get = item.get
+                    metadata = get('imageMediaMetadata') or {}
+                    
+                    append(PhotoMeta(
+                        id=item['id'],
+                        filename=get('name', 'unknown'),
+                        mimeType=get('mimeType', ''),
+                        createdTime=get('createdTime', ''),
+                        size=to_int(get('size')),
+                        width=to_int(metadata.get('width')),
+                        height=to_int(metadata.get('height')),
+                    ))
+                
+                with progress_lock:
+                    progress['batches'] += 1
+                    progress['photos'] += len(items)
+                    progress['line'].update(f"Batch {progress['batches']}: Found {progress['photos']} photos so far...")
+        
+        return photos
+    
+    def download_photo(self, photo_id: str, output_path: Path, http=None) -> bool:
         """
         Download a photo from Google Drive
         
         Args:
             photo_id: Drive file ID
             output_path: Local path to save the photo
+            http: Authorized Http to use instead of the service's own (one per thread)
         
         Returns:
             True if successful, False otherwise
@@ -214,14 +233,16 @@ class GoogleDrivePhotosClient:
             from googleapiclient.http import MediaIoBaseDownload
             
             request = self.service.files().get_media(fileId=photo_id)
+            if http is not None:
+                request.http = http
             
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(output_path, 'wb') as fh:
-                downloader = MediaIoBaseDownload(fh, request)
+                downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
                 done = False
                 while not done:
-                    status, done = downloader.next_chunk()
+                    status, done = call_with_retry(downloader.next_chunk, limiter=_rate_limiter)
             
             return True
             
@@ -229,6 +250,35 @@ class GoogleDrivePhotosClient:
             print(f"{Fore.YELLOW}Warning: Failed to download photo: {e}")
             return False
     
+    def download_photos(self, items: List[Tuple[str, Path]], workers: int = DOWNLOAD_MAX_WORKERS) -> List[bool]:
+        """
+        Download several photos concurrently
+        
+        Args:
+            items: (photo_id, output_path) pairs
+            workers: Number of downloads in flight at once
+        
+        Returns:
+            A success flag per item, in the same order as items
+        """
+        import google_auth_httplib2
+        import httplib2
+        
+        # Refresh before fanning out so workers never see the credentials mid-update
+        self._refresh_if_expiring()
+        
+        # httplib2 connections are not thread-safe, so each worker gets its own
+        local = threading.local()
+        
+        def download(photo_id: str, output_path: Path) -> bool:
+            if not hasattr(local, 'http'):
+                local.http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+            return self.download_photo(photo_id, output_path, http=local.http)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(download, photo_id, output_path) for photo_id, output_path in items]
+            return [future.result() for future in futures]
+    
     def delete_photo(self, photo_id: str) -> bool:
         """
         Delete (trash) a photo in Google Drive
@@ -239,22 +289,65 @@ class GoogleDrivePhotosClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Move file to trash (doesn't permanently delete)
-            self.service.files().delete(fileId=photo_id).execute()
-            return True
+        return self.delete_photos_batch([photo_id]).get(photo_id, False)
+    
+    def delete_photos_batch(self, photo_ids: List[str]) -> Dict[str, bool]:
+        """
+        Delete photos in Google Drive using batch HTTP requests
+        
+        Sends DELETE_BATCH_SIZE deletes per round trip instead of one.
+        
+        Args:
+            photo_ids: Drive file IDs
+        
+        Returns:
+            Map of file ID to success flag
+        """
+        results = {}
+        retry_ids = []
+        
+        def on_response(request_id, response, exception):
+            if exception is not None and transient_status(exception) is not None:
+                retry_ids.append(request_id)  # Rate limited or server error: try again
+                return
+            if exception is not None:
+                print(f"{Fore.RED}Error deleting photo {request_id}: {exception}")
+            results[request_id] = exception is None
+        
+        for start in range(0, len(photo_ids), DELETE_BATCH_SIZE):
+            pending = photo_ids[start:start + DELETE_BATCH_SIZE]
+            for attempt in range(RETRY_MAX_ATTEMPTS):
+                retry_ids.clear()
+                try:
+                    batch = self.service.new_batch_http_request(callback=on_response)
+                    for photo_id in pending:
+                        batch.add(self.service.files().delete(fileId=photo_id), request_id=photo_id)
+                    # Each call in a batch counts against the quota separately
+                    _rate_limiter.acquire(len(pending) - 1)
+                    call_with_retry(batch.execute, limiter=_rate_limiter)
+                except Exception as e:
+                    print(f"{Fore.RED}Error deleting batch of {len(pending)} photos: {e}")
+                    break
+                if not retry_ids:
+                    break
+                pending = list(retry_ids)
+                if attempt < RETRY_MAX_ATTEMPTS - 1:
+                    time.sleep(RETRY_BASE_DELAY * 2 ** attempt)
             
-        except HttpError as e:
-            print(f"{Fore.RED}Error deleting photo {photo_id}: {e}")
-            return False
-        except Exception as e:
-            print(f"{Fore.RED}Error deleting photo {photo_id}: {e}")
-            return False
+            for photo_id in pending:
+                results.setdefault(photo_id, False)
+        
+        return results
+
+
+# The authenticated client, shared by every later create_google_drive_photos_client() call
+_client: Optional[GoogleDrivePhotosClient] = None
+_client_lock = threading.Lock()
 
 
 def create_google_drive_photos_client() -> Optional[GoogleDrivePhotosClient]:
     """
-    Create and authenticate a Google Drive Photos client
+    Create and authenticate a Google Drive Photos client, or reuse the one already created
     
     Returns:
         Authenticated GoogleDrivePhotosClient or None if failed
@@ -264,8 +357,11 @@ def create_google_drive_photos_client() -> Optional[GoogleDrivePhotosClient]:
         print(f"{Fore.YELLOW}Install dependencies: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client")
         return None
     
-    client = GoogleDrivePhotosClient()
-    if client.authenticate():
-        return client
-    return None
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = GoogleDrivePhotosClient()
+            if client.authenticate():
+                _client = client
+        return _client
 
@@ -3,255 +3,486 @@ Google Photos API Client for Photo Cleaner
 Handles authentication and photo operations with Google Photos
 """
 
+import functools
+import hashlib
+import importlib.util
 import json
 import os
-import pickle
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
 
+import requests
 from colorama import Fore
 
-try:
-    from google.auth.transport.requests import Request
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import InstalledAppFlow
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    GOOGLE_PHOTOS_AVAILABLE = True
-except ImportError:
-    GOOGLE_PHOTOS_AVAILABLE = False
+from google_common import (PhotoMeta, PhotoMetaListing, ProgressLine, RateLimiter, _GoogleOAuthClient,
+                           call_with_retry, json_model, to_int)
+
+# The Google client libraries are slow to import, so they are imported where
+# they are used; this only checks that they are installed
+GOOGLE_PHOTOS_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ('googleapiclient', 'google_auth_oauthlib')
+)
 
 
 # Scopes required for Google Photos
 SCOPES = ['https://www.googleapis.com/auth/photoslibrary.readonly',
           'https://www.googleapis.com/auth/photoslibrary.appendonly']
 
+# Concurrent downloads in download_photos (also the HTTP connection pool size)
+DOWNLOAD_MAX_WORKERS = 8
+
+# Bytes read from the network / written to disk at a time when downloading
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# (connect, read) timeouts in seconds for photo downloads
+DOWNLOAD_TIMEOUT = (5, 30)
+
+# Safety cap on pages per listing (100 items each), in case the API keeps returning page tokens
+LIST_MAX_PAGES = 10000
+
+# Seconds an interrupted listing can be resumed for (baseUrls expire after an hour)
+SCAN_RESUME_MAX_AGE = 60 * 60
+
+# Partial responses: only the fields the listing uses (about a third of the full payload)
+MEDIA_ITEM_FIELDS = 'nextPageToken,mediaItems(id,filename,baseUrl,mimeType,mediaMetadata(creationTime,width,height,photo))'
+ALBUM_FIELDS = 'nextPageToken,albums(id,title)'
+
+# mediaItems.batchGet accepts at most 50 IDs per call
+BATCH_GET_MAX_IDS = 50
+
+# Seconds a cached album title -> ID entry is trusted before the album list is re-read
+ALBUM_CACHE_TTL = 6 * 60 * 60
+
+# Requests per second to Google Photos across all threads (with a short burst allowance)
+API_MAX_REQUESTS_PER_SECOND = 10
+API_BURST = 20
+
+# Where fetched API discovery documents are cached, and for how long (seconds)
+DISCOVERY_CACHE_DIR = Path.home() / '.photocleaner_discovery_cache'
+DISCOVERY_CACHE_TTL = 24 * 60 * 60
+
+
+
+# Shared by every client and worker thread in the process
+_rate_limiter = RateLimiter(API_MAX_REQUESTS_PER_SECOND, API_BURST)
+
+
+@functools.lru_cache(maxsize=16)
+def _date_filters(date_from: Optional[str], date_to: Optional[str]) -> Dict:
+    """
+    mediaItems.search filters for a YYYY-MM-DD date range (empty if no dates)
+    
+    Cached, so repeated listings with the same range share one (read-only) dict.
+    """
+    if not (date_from or date_to):
+        return {}
+    
+    if date_from:
+        start = date.fromisoformat(date_from)
+        start_date = {'year': start.year, 'month': start.month, 'day': start.day}
+    else:
+        start_date = {'year': 2000, 'month': 1, 'day': 1}
+    
+    if date_to:
+        end = date.fromisoformat(date_to)
+        end_date = {'year': end.year, 'month': end.month, 'day': end.day}
+    else:
+        end_date = {'year': 2100, 'month': 12, 'day': 31}
+    
+    return {'dateFilter': {'ranges': [{'startDate': start_date, 'endDate': end_date}]}}
+
 
-class GooglePhotosClient:
+class DiscoveryFileCache:
+    """
+    On-disk cache for API discovery documents, passed to build(cache=...)
+    
+    The Photos Library discovery document is not bundled with
+    googleapiclient, and its built-in file cache only works with the
+    long-deprecated oauth2client, so without this every run re-downloads it.
+    """
+    
+    def __init__(self, directory: Path = DISCOVERY_CACHE_DIR, ttl: float = DISCOVERY_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+    
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+    
+    def get(self, url: str) -> Optional[str]:
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime < self.ttl:
+                return path.read_text()
+        except OSError:
+            pass
+        return None
+    
+    def set(self, url: str, content: str):
+        try:
+            self.directory.mkdir(exist_ok=True)
+            self._path(url).write_text(content)
+        except OSError:
+            pass  # Caching is best-effort
+
+
+class GooglePhotosClient(_GoogleOAuthClient):
     """Client for interacting with Google Photos API"""
     
+    SCOPES = SCOPES
+    DISPLAY_NAME = 'Google Photos'
+    TOKEN_NAME = 'google'
+    MISSING_CREDENTIALS_HINT = 'Run --google-photos-setup to see setup instructions'
+    
     def __init__(self):
-        self.service = None
-        self.creds = None
-        self.token_path = Path.home() / '.photocleaner_google_token.pickle'
+        super().__init__()
+        self.album_cache_file = Path.home() / '.photocleaner_google_albums.json'
+        self.scan_state_dir = Path.home() / '.photocleaner_google_scans'  # One resume file per listing
+        self._album_cache: Optional[Dict[str, Tuple[str, float]]] = None  # Lowercase title -> (album ID, fetched at)
+        # Keep-alive session so downloads reuse connections instead of a new TLS handshake each
+        self._http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=DOWNLOAD_MAX_WORKERS)
+        self._http.mount('https://', adapter)
+    
+    def _build_service(self):
+        from googleapiclient.discovery import build
+        
+        return build('photoslibrary', 'v1', credentials=self.creds, static_discovery=False,
+                     cache=DiscoveryFileCache(), model=json_model())
     
-    def authenticate(self, credentials_file: str = 'google_photos_credentials.json') -> bool:
+    def list_photos(self, album_name: Optional[str] = None, 
+                    date_from: Optional[str] = None, 
+                    date_to: Optional[str] = None) -> List[PhotoMeta]:
         """
-        Authenticate with Google Photos
+        List photos from Google Photos
         
         Args:
-            credentials_file: Path to OAuth 2.0 client credentials JSON file
+            album_name: Optional album name to filter by
+            date_from: Optional start date (YYYY-MM-DD)
+            date_to: Optional end date (YYYY-MM-DD)
         
         Returns:
-            True if authentication successful, False otherwise
+            List of PhotoMeta records (usable like read-only metadata dicts).
+            If the listing fails part way, the photos found so far.
         """
-        creds_path = Path(credentials_file)
-        
-        if not creds_path.exists():
-            print(f"{Fore.RED}Error: Google Photos credentials file not found: {credentials_file}")
-            print(f"{Fore.YELLOW}Run --google-photos-setup to see setup instructions")
-            return False
-        
-        # Check if we have cached credentials
-        if self.token_path.exists():
-            try:
-                with open(self.token_path, 'rb') as token:
-                    self.creds = pickle.load(token)
-                    
-                # Verify scopes match - if not, force re-authentication
-                if self.creds and hasattr(self.creds, 'scopes'):
-                    cached_scopes = set(self.creds.scopes) if self.creds.scopes else set()
-                    required_scopes = set(SCOPES)
-                    if cached_scopes != required_scopes:
-                        print(f"{Fore.YELLOW}Cached credentials have different scopes, re-authenticating...")
-                        self.creds = None
-            except Exception as e:
-                print(f"{Fore.YELLOW}Warning: Could not load cached credentials: {e}")
-                self.creds = None
-        
-        # If no valid credentials, authenticate
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                try:
-                    print(f"{Fore.CYAN}Refreshing Google Photos access token...")
-                    self.creds.refresh(Request())
-                except Exception as e:
-                    print(f"{Fore.YELLOW}Could not refresh token: {e}")
-                    self.creds = None
-            
-            if not self.creds:
-                try:
-                    print(f"{Fore.CYAN}Opening browser for Google Photos authentication...")
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        str(creds_path), SCOPES)
-                    self.creds = flow.run_local_server(port=0)
-                except Exception as e:
-                    print(f"{Fore.RED}Authentication failed: {e}")
-                    return False
-            
-            # Save credentials for next time
-            try:
-                with open(self.token_path, 'wb') as token:
-                    pickle.dump(self.creds, token)
-                print(f"{Fore.GREEN}✓ Credentials cached for future use")
-            except Exception as e:
-                print(f"{Fore.YELLOW}Warning: Could not cache credentials: {e}")
+        from googleapiclient.errors import HttpError
         
+        photos = []
         try:
-            self.service = build('photoslibrary', 'v1', credentials=self.creds, static_discovery=False)
-            print(f"{Fore.GREEN}✓ Successfully connected to Google Photos")
-            return True
+            # extend() appends as the generator yields, so a failure keeps earlier pages
+            photos.extend(self.iter_photos(album_name, date_from, date_to))
+            print(f"{Fore.GREEN}✓ Found {len(photos)} photos total")
+            return photos
+            
+        except HttpError as e:
+            print(f"{Fore.RED}Google Photos API error: {e}")
         except Exception as e:
-            print(f"{Fore.RED}Failed to build Google Photos service: {e}")
-            return False
+            print(f"{Fore.RED}Error listing photos: {e}")
+        
+        if photos:
+            print(f"{Fore.YELLOW}Continuing with the {len(photos)} photos listed before the error")
+        return photos
     
-    def list_photos(self, album_name: Optional[str] = None, 
+    def iter_photos(self, album_name: Optional[str] = None, 
                     date_from: Optional[str] = None, 
-                    date_to: Optional[str] = None) -> List[Dict]:
+                    date_to: Optional[str] = None) -> Iterator[PhotoMeta]:
         """
-        List photos from Google Photos
+        Yield photos from Google Photos as their pages arrive
         
-        Args:
-            album_name: Optional album name to filter by
-            date_from: Optional start date (YYYY-MM-DD)
-            date_to: Optional end date (YYYY-MM-DD)
+        Takes the same arguments as list_photos, but pages are fetched on
+        demand, so callers can start on the first photos before the listing
+        finishes. API errors are raised rather than reported.
         
-        Returns:
-            List of photo metadata dictionaries
+        Each page is also saved to a file in scan_state_dir, so a listing that is
+        interrupted can pick up where it stopped when the same listing is
+        run again within SCAN_RESUME_MAX_AGE.
         """
         if not self.service:
             print(f"{Fore.RED}Not authenticated with Google Photos")
-            return []
+            return
         
-        photos = []
+        filters = _date_filters(date_from, date_to)
+        
+        # If album specified, find it first
+        album_id = None
+        if album_name:
+            print(f"{Fore.CYAN}Searching for album: {album_name}")
+            album_id = self._find_album_id(album_name)
+            if album_id:
+                print(f"{Fore.GREEN}✓ Found album: {album_name}")
+            else:
+                print(f"{Fore.YELLOW}Warning: Album '{album_name}' not found")
+                return
+        
+        # Pick up an interrupted run of the same listing
+        scan_key = hashlib.sha256(json.dumps([album_id, filters], sort_keys=True).encode()).hexdigest()
+        state_path = self._scan_state_path(scan_key)
+        resumed, page_token, resumed_pages, started = self._load_scan_state(state_path, scan_key)
+        state = self._open_scan_state(state_path, scan_key, started, resumed, page_token, resumed_pages)
+        
+        # Search for photos
+        print(f"{Fore.CYAN}Fetching photos from Google Photos...")
+        self._refresh_if_expiring()
+        batch_count = resumed_pages  # LIST_MAX_PAGES covers the resumed pages too
+        total = 0
+        progress = ProgressLine()
         
         try:
-            # Build date filter if provided
-            filters = {}
-            if date_from or date_to:
-                date_filter = {'ranges': []}
-                
-                if date_from:
-                    date_parts = date_from.split('-')
-                    start_date = {
-                        'year': int(date_parts[0]),
-                        'month': int(date_parts[1]),
-                        'day': int(date_parts[2])
-                    }
-                else:
-                    start_date = {'year': 2000, 'month': 1, 'day': 1}
-                
-                if date_to:
-                    date_parts = date_to.split('-')
-                    end_date = {
-                        'year': int(date_parts[0]),
-                        'month': int(date_parts[1]),
-                        'day': int(date_parts[2])
-                    }
-                else:
-                    end_date = {'year': 2100, 'month': 12, 'day': 31}
+            # Page tokens are strictly sequential, but the next page can be
+            # fetched while the current one is processed
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(self._fetch_media_page, album_id, filters, page_token)
+                if resumed:
+                    print(f"{Fore.CYAN}Resuming an interrupted listing after {len(resumed)} photos...")
+                    total = len(resumed)
+                    for record in resumed:
+                        yield PhotoMeta(**record)
                 
-                date_filter['ranges'].append({
-                    'startDate': start_date,
-                    'endDate': end_date
-                })
-                
-                filters['dateFilter'] = date_filter
-            
-            # If album specified, find it first
-            album_id = None
-            if album_name:
-                print(f"{Fore.CYAN}Searching for album: {album_name}")
-                albums = []
-                page_token = None
-                
-                while True:
-                    results = self.service.albums().list(
-                        pageSize=50,
-                        pageToken=page_token
-                    ).execute()
+                while future:
+                    batch_count += 1
+                    results = future.result()
                     
-                    albums.extend(results.get('albums', []))
                     page_token = results.get('nextPageToken')
-                    if not page_token:
-                        break
-                
-                # Find matching album
-                for album in albums:
-                    if album['title'].lower() == album_name.lower():
-                        album_id = album['id']
-                        print(f"{Fore.GREEN}✓ Found album: {album_name}")
-                        break
-                
-                if not album_id:
-                    print(f"{Fore.YELLOW}Warning: Album '{album_name}' not found")
-                    return []
-            
-            # Search for photos
-            print(f"{Fore.CYAN}Fetching photos from Google Photos...")
-            page_token = None
-            batch_count = 0
+                    future = None
+                    if page_token and batch_count >= LIST_MAX_PAGES:
+                        progress.finish()
+                        print(f"{Fore.YELLOW}Warning: Stopping after {LIST_MAX_PAGES} pages; the listing may be incomplete")
+                    elif page_token:
+                        # No request is in flight here, so refreshing can't race a fetch
+                        self._refresh_if_expiring(progress)
+                        future = executor.submit(self._fetch_media_page, album_id, filters, page_token)
+                    
+                    items = results.get('mediaItems', [])
+                    
+                    # Filter and process items
+                    photos = []
+                    append = photos.append
+                    for item in items:
+                        metadata = item.get('mediaMetadata')
+                        if not metadata:
+                            continue
+                        # Only include photos (not videos); a partial response can
+                        # leave out an empty photo object, so fall back to the MIME type
+                        mime_type = item.get('mimeType', '')
+                        if 'photo' not in metadata and not mime_type.startswith('image/'):
+                            continue
+                        get = metadata.get
+                        append(PhotoMeta(
+                            id=item['id'],
+                            filename=item.get('filename', 'unknown'),
+                            url=item['baseUrl'],
+                            mimeType=mime_type,
+                            createdTime=get('creationTime', ''),
+                            width=to_int(get('width')),
+                            height=to_int(get('height')),
+                        ))
+                    
+                    if state:
+                        try:
+                            self._save_scan_page(state, [photo.to_dict() for photo in photos], page_token)
+                        except OSError:
+                            state.close()
+                            state = None  # Resuming is best-effort
+                    
+                    total += len(photos)
+                    progress.update(f"Batch {batch_count}: Found {total} photos so far...")
+                    yield from photos
+        finally:
+            progress.finish()
+            if state:
+                state.close()
+        
+        # Finished, so there is nothing to resume
+        state_path.unlink(missing_ok=True)
+    
+    def _scan_state_path(self, scan_key: str) -> Path:
+        """Resume file for the listing identified by scan_key (album and filters)"""
+        return self.scan_state_dir / f"{scan_key[:32]}.jsonl"
+    
+    @staticmethod
+    def _read_scan_header(f) -> Tuple[Optional[str], float]:
+        """scan_key and start time from a resume file's first line (start 0 if missing)"""
+        header = json.loads(f.readline())
+        return header.get('key'), float(header.get('started') or 0)
+    
+    @staticmethod
+    def _load_scan_state(state_path: Path, scan_key: str) -> Tuple[List[Dict], Optional[str], int, float]:
+        """
+        Photos saved by an interrupted listing, the page token to continue from,
+        how many pages they came from, and when that listing started
+        
+        The age check uses the start time recorded in the file, not its mtime,
+        which every resume and page append moves on: the baseUrls of the
+        earliest saved photos expire an hour after they were listed. Returns
+        ([], None, 0, now) unless the saved listing is recent and has the same
+        scan_key.
+        """
+        now = time.time()
+        photos, page_token, pages = [], None, 0
+        try:
+            with open(state_path) as f:
+                key, started = GooglePhotosClient._read_scan_header(f)
+                if key != scan_key or now - started >= SCAN_RESUME_MAX_AGE:
+                    return [], None, 0, now
+                for line in f:
+                    page = json.loads(line)
+                    photos.extend(page['photos'])
+                    page_token = page['next']
+                    pages += page.get('pages', 1)
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            pass  # Keep the pages before a line cut short by a crash
+        return (photos, page_token, pages, started) if page_token else ([], None, 0, now)
+    
+    def _open_scan_state(self, state_path: Path, scan_key: str, started: float, resumed: List[Dict],
+                         page_token: Optional[str], resumed_pages: int):
+        """
+        Start the resume file for a listing, carrying over any resumed pages
+        
+        Resumed pages are rewritten as one line, dropping anything after a
+        line cut short by a crash, and keep their listing's original start
+        time. Other listings keep their own files; those too old to resume
+        are removed.
+        """
+        try:
+            self.scan_state_dir.mkdir(exist_ok=True)
+            for old_path in self.scan_state_dir.glob('*.jsonl'):
+                if old_path == state_path:
+                    continue
+                try:
+                    try:
+                        with open(old_path) as f:
+                            old_started = self._read_scan_header(f)[1]
+                    except (ValueError, AttributeError, TypeError):
+                        old_started = 0  # Unreadable header: never resumable
+                    if time.time() - old_started >= SCAN_RESUME_MAX_AGE:
+                        old_path.unlink()
+                except OSError:
+                    pass
+            state = open(state_path, 'w')
+            state.write(json.dumps({'key': scan_key, 'started': started}) + '\n')
+            if page_token:
+                self._save_scan_page(state, resumed, page_token, resumed_pages)
+            return state
+        except OSError as e:
+            print(f"{Fore.YELLOW}Warning: Could not save listing progress: {e}")
+            return None
+    
+    @staticmethod
+    def _save_scan_page(state, photos: List[Dict], page_token: Optional[str], pages: int = 1):
+        """Append listed photos, the number of pages they span, and the token for the page after them"""
+        state.write(json.dumps({'photos': photos, 'next': page_token, 'pages': pages}) + '\n')
+        state.flush()
+    
+    def list_photos_soa(self, *args, **kwargs) -> PhotoMetaListing:
+        """
+        Same as list_photos, but returned as parallel column arrays
+        
+        Takes the same arguments as list_photos.
+        """
+        return PhotoMetaListing.from_photos(self.list_photos(*args, **kwargs))
+    
+    def _find_album_id(self, album_name: str) -> Optional[str]:
+        """
+        Resolve an album title (case-insensitive) to its ID
+        
+        Titles are cached in memory and on disk, each for ALBUM_CACHE_TTL, so
+        the album list is only paged through again for an unknown or stale title.
+        """
+        key = album_name.lower()
+        if self._album_cache is None:
+            self._album_cache = self._load_album_cache()
+        entry = self._album_cache.get(key)
+        if entry and time.time() - entry[1] < ALBUM_CACHE_TTL:
+            return entry[0]
+        
+        fetched_at = time.time()
+        albums = {}
+        page_token = None
+        while True:
+            request = self.service.albums().list(
+                pageSize=50,
+                pageToken=page_token,
+                fields=ALBUM_FIELDS
+            )
+            results = call_with_retry(request.execute, limiter=_rate_limiter)
             
-            while True:
-                batch_count += 1
-                
-                # Build request body
-                request_body = {'pageSize': 100}
-                
-                if page_token:
-                    request_body['pageToken'] = page_token
-                
-                if album_id:
-                    request_body['albumId'] = album_id
-                elif filters:
-                    request_body['filters'] = filters
-                
-                # Make API request
-                # Use search() when we have albumId or filters, list() otherwise
-                if album_id or filters:
-                    results = self.service.mediaItems().search(body=request_body).execute()
+            for album in results.get('albums', []):
+                # First match wins, as when scanning the list in order
+                albums.setdefault(album['title'].lower(), (album['id'], fetched_at))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        self._album_cache = albums
+        try:
+            self.album_cache_file.write_text(json.dumps(albums))
+        except OSError as e:
+            print(f"{Fore.YELLOW}Warning: Could not cache album list: {e}")
+        entry = albums.get(key)
+        return entry[0] if entry else None
+    
+    def _load_album_cache(self) -> Dict[str, Tuple[str, float]]:
+        """Load the on-disk album cache; entry freshness is checked on lookup"""
+        try:
+            cached = json.loads(self.album_cache_file.read_text())
+            return {title: (entry[0], float(entry[1])) for title, entry in cached.items()}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            return {}
+    
+    def batch_get(self, ids: List[str]) -> List[Dict]:
+        """
+        Fetch media items by ID, up to BATCH_GET_MAX_IDS per request
+        
+        Useful for re-reading metadata, e.g. refreshing baseUrls (which expire
+        after an hour), without one request per item.
+        
+        Args:
+            ids: Media item IDs
+        
+        Returns:
+            Media item dictionaries for the IDs that were found, in request order
+        """
+        items = []
+        for start in range(0, len(ids), BATCH_GET_MAX_IDS):
+            chunk = ids[start:start + BATCH_GET_MAX_IDS]
+            request = self.service.mediaItems().batchGet(mediaItemIds=chunk)
+            results = call_with_retry(request.execute, limiter=_rate_limiter)
+            for result in results.get('mediaItemResults', []):
+                if 'mediaItem' in result:
+                    items.append(result['mediaItem'])
                 else:
-                    # list() doesn't use a body, just query parameters
-                    list_params = {'pageSize': 100}
-                    if page_token:
-                        list_params['pageToken'] = page_token
-                    results = self.service.mediaItems().list(**list_params).execute()
-                
-                items = results.get('mediaItems', [])
-                
-                # Filter and process items
-                for item in items:
-                    # Only include photos (not videos)
-                    if 'photo' in item.get('mediaMetadata', {}):
-                        metadata = item.get('mediaMetadata', {})
-                        creation_time = metadata.get('creationTime', '')
-                        
-                        photos.append({
-                            'id': item['id'],
-                            'filename': item.get('filename', 'unknown'),
-                            'url': item['baseUrl'],
-                            'mimeType': item.get('mimeType', ''),
-                            'creationTime': creation_time,
-                            'width': int(metadata.get('width', 0)),
-                            'height': int(metadata.get('height', 0)),
-                        })
-                
-                print(f"{Fore.CYAN}Batch {batch_count}: Found {len(photos)} photos so far...")
-                
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
-            
-            print(f"{Fore.GREEN}✓ Found {len(photos)} photos total")
-            return photos
-            
-        except HttpError as e:
-            print(f"{Fore.RED}Google Photos API error: {e}")
-            return []
-        except Exception as e:
-            print(f"{Fore.RED}Error listing photos: {e}")
-            return []
+                    print(f"{Fore.YELLOW}Warning: Could not fetch media item {result.get('mediaItemId')}: {result.get('status')}")
+        return items
+    
+    def _fetch_media_page(self, album_id: Optional[str], filters: Dict, page_token: Optional[str]) -> Dict:
+        """Fetch one page of media items (runs in the lookahead thread)"""
+        # Build request body
+        request_body = {'pageSize': 100}
+        
+        if page_token:
+            request_body['pageToken'] = page_token
+        
+        if album_id:
+            request_body['albumId'] = album_id
+        elif filters:
+            request_body['filters'] = filters
+        
+        # Make API request
+        # Use search() when we have albumId or filters, list() otherwise
+        if album_id or filters:
+            request = self.service.mediaItems().search(body=request_body, fields=MEDIA_ITEM_FIELDS)
+        else:
+            # list() doesn't use a body, just query parameters
+            list_params = {'pageSize': 100, 'fields': MEDIA_ITEM_FIELDS}
+            if page_token:
+                list_params['pageToken'] = page_token
+            request = self.service.mediaItems().list(**list_params)
+        return call_with_retry(request.execute, limiter=_rate_limiter)
     
     def download_photo(self, photo_url: str, output_path: Path) -> bool:
         """
@@ -265,17 +496,19 @@ class GooglePhotosClient:
             True if successful, False otherwise
         """
         try:
-            import requests
-            
             # Append download parameters to base URL
             download_url = f"{photo_url}=d"  # =d for download
             
-            response = requests.get(download_url, timeout=30)
-            response.raise_for_status()
+            def fetch():
+                response = self._http.get(download_url, timeout=DOWNLOAD_TIMEOUT, stream=True)
+                response.raise_for_status()
+                return response
             
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            with call_with_retry(fetch, limiter=_rate_limiter) as response, open(output_path, 'wb') as f:
+                # Copy straight from the socket so only one chunk is ever held in memory
+                response.raw.decode_content = True
+                shutil.copyfileobj(response.raw, f, DOWNLOAD_CHUNK_SIZE)
             
             return True
             
@@ -283,6 +516,21 @@ class GooglePhotosClient:
             print(f"{Fore.YELLOW}Warning: Failed to download photo: {e}")
             return False
     
+    def download_photos(self, items: List[Tuple[str, Path]], workers: int = DOWNLOAD_MAX_WORKERS) -> List[bool]:
+        """
+        Download several photos concurrently
+        
+        Args:
+            items: (photo_url, output_path) pairs
+            workers: Number of downloads in flight at once
+        
+        Returns:
+            A success flag per item, in the same order as items
+        """
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.download_photo, photo_url, output_path) for photo_url, output_path in items]
+            return [future.result() for future in futures]
+    
     def delete_photo(self, photo_id: str) -> bool:
         """
         Delete (move to trash) a photo in Google Photos
@@ -363,9 +611,14 @@ def setup_google_photos():
     print(f"{Fore.CYAN}{'='*80}\n")
 
 
+# The authenticated client, shared by every later create_google_photos_client() call
+_client: Optional[GooglePhotosClient] = None
+_client_lock = threading.Lock()
+
+
 def create_google_photos_client() -> Optional[GooglePhotosClient]:
     """
-    Create and authenticate a Google Photos client
+    Create and authenticate a Google Photos client, or reuse the one already created
     
     Returns:
         Authenticated GooglePhotosClient or None if failed
@@ -375,8 +628,11 @@ def create_google_photos_client() -> Optional[GooglePhotosClient]:
         print(f"{Fore.YELLOW}Install dependencies: pip install google-auth-oauthlib google-auth-httplib2 google-api-python-client")
         return None
     
-    client = GooglePhotosClient()
-    if client.authenticate():
-        return client
-    return None
+    global _client
+    with _client_lock:
+        if _client is None:
+            client = GooglePhotosClient()
+            if client.authenticate():
+                _client = client
+        return _client
 
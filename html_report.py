@@ -3,65 +3,241 @@ HTML Report Generator for Photo Cleaner
 Generates beautiful, interactive HTML reports showing photo groupings and deletions
 """
 
-import base64
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from io import BytesIO
+from html import escape
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, TextIO
 
-from PIL import Image
+import numpy as np
+
+from PIL import Image, ImageOps
 from colorama import Fore
 
+# pybase64 is optional: a SIMD-accelerated encoder for the embedded thumbnails
+try:
+    from pybase64 import b64encode_as_string as _b64encode
+except ImportError:
+    import base64
+    
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode()
+
+# Worker processes for thumbnail generation (decoding and resizing is CPU-bound)
+THUMBNAIL_MAX_WORKERS = os.cpu_count() or 1
+
+# Below this many images, starting a process pool costs more than it saves
+THUMBNAIL_POOL_MIN_IMAGES = 8
+
+# Threads used instead of processes for small reports; Pillow releases the GIL
+# while decoding and resizing, so they still overlap with writing the report
+THUMBNAIL_THREAD_WORKERS = min(8, os.cpu_count() or 1)
+
+# Thumbnails each worker may have finished ahead of the report being written
+THUMBNAIL_PREFETCH = 4
+
+# JPEG quality of report thumbnails; they are small previews, so 4:2:0 chroma is used too
+THUMBNAIL_QUALITY = 75
+
+# Preallocated JPEG encoding buffer; 300px thumbnails are usually 10-30 KB
+THUMBNAIL_BUFFER_SIZE = 64 * 1024
+
+# JPEGs smaller than this (and within the thumbnail size) are embedded without re-encoding
+THUMBNAIL_PASSTHROUGH_MAX_BYTES = 30_000
+
+# Thumbnail cache, inside the report directory, reused across report generations
+THUMBNAIL_CACHE_DIRNAME = '.photo_cleaner_cache'
+
+# Size the thumbnail cache is pruned back to after each report, least recently used first
+THUMBNAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Per-thread JPEG encoding buffer, reused for every thumbnail a worker makes
+_thumbnail_buffers = threading.local()
+
+# Units used by format_size, each 1024 times the previous one
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Static CSS and JavaScript, inlined into every report so it stays a single self-contained file
+ASSETS_DIR = Path(__file__).parent / 'report_assets'
+_REPORT_CSS = (ASSETS_DIR / 'report.css').read_text(encoding='utf-8')
+_REPORT_JS = (ASSETS_DIR / 'report.js').read_text(encoding='utf-8')
+_GALLERY_CSS = (ASSETS_DIR / 'gallery.css').read_text(encoding='utf-8')
+
+# Per-group report HTML, filled in with str.format_map for each group and image
+_GROUP_HEADER_TEMPLATE = """
+            <div class="group" data-group="{idx}">
+                <div class="group-header">
+                    <span>Group {idx} of {group_count}</span>
+                    <div style="display: flex; align-items: center; gap: 20px;">
+                        <span>{image_count} similar images • {space} to save</span>
+                        <button class="delete-group-btn" onclick="deleteEntireGroup({idx})" title="Mark all images in this group for deletion">
+                            🗑️ Delete Entire Group
+                        </button>
+                    </div>
+                </div>
+                <div class="group-content">
+                    <div class="image-grid">
+"""
+
+_IMAGE_CARD_TEMPLATE = """
+                        <div class="image-card {action}" data-path="{data_path}" data-id="{cloud_id}" data-group="{idx}" data-size="{size_bytes}">
+                            <button class="rotate-btn" onclick="rotateImage(this)" title="Rotate 90°">↻</button>
+                            <button class="toggle-btn" onclick="toggleKeepDelete(this)">{toggle_label}</button>
+                            <div class="image-header">{header}</div>
+                            {thumbnail_tag}
+                            <div class="image-info">
+                                <div class="image-filename">{name}</div>
+                                <div class="image-stats">
+                                    <div class="stat">
+                                        <span class="stat-label">Resolution:</span>
+                                        <span class="stat-value">{resolution:.2f} MP</span>
+                                    </div>
+                                    <div class="stat">
+                                        <span class="stat-label">Size:</span>
+                                        <span class="stat-value">{size}</span>
+                                    </div>
+                                    <div class="stat">
+                                        <span class="stat-label">Sharpness:</span>
+                                        <span class="stat-value">{sharpness:.1f}</span>
+                                    </div>
+                                </div>
+                                <div style="text-align: center;">
+                                    <span class="score-badge">Score: {score:.2f}</span>
+                                </div>
+                            </div>
+                        </div>
+"""
+
+_GROUP_FOOTER = """
+                    </div>
+                </div>
+            </div>
+"""
+
 
 class HTMLReportGenerator:
     """Generates HTML reports for photo cleaning operations"""
     
-    def __init__(self, directory: Path, threshold: int, dry_run: bool):
+    def __init__(self, directory: Path, threshold: int, dry_run: bool, thumb_quality: int = THUMBNAIL_QUALITY,
+                 thumbnail_cache: bool = True):
         self.directory = directory
         self.threshold = threshold
         self.dry_run = dry_run
+        self.thumb_quality = thumb_quality
+        # Pass thumbnail_cache=False for images that won't be seen again (e.g. temporary
+        # cloud downloads): their paths and mtimes change every run, so entries never hit
+        self._thumb_cache_dir = directory / THUMBNAIL_CACHE_DIRNAME if thumbnail_cache else None
     
     @staticmethod
     def format_size(size_bytes: int) -> str:
         """Format bytes to human readable string"""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} TB"
+        # Each unit is 2**10 times the last, so the bit length picks it directly
+        unit = min((int(size_bytes).bit_length() - 1) // 10, len(SIZE_UNITS) - 1) if size_bytes >= 1 else 0
+        return f"{size_bytes / (1 << (10 * unit)):.2f} {SIZE_UNITS[unit]}"
+    
+    @staticmethod
+    def format_sizes(sizes: Iterable[int]) -> List[str]:
+        """format_size for many sizes at once, picking units and scaling in one NumPy pass"""
+        sizes = np.fromiter(sizes, dtype=np.int64).astype(np.float64)
+        # frexp's exponent is the bit length of each (positive) size
+        units = np.minimum((np.frexp(sizes)[1] - 1) // 10, len(SIZE_UNITS) - 1)
+        units[sizes < 1] = 0
+        values = sizes / np.ldexp(1.0, 10 * units)
+        return [f"{value:.2f} {SIZE_UNITS[unit]}" for value, unit in zip(values.tolist(), units.tolist())]
+    
+    @staticmethod
+    def _thumbnail_cache_path(cache_dir: Path, image_path: Path, stat: os.stat_result, max_size: int, quality: int) -> Path:
+        """Cache file for image_path's thumbnail, keyed on its current mtime and size"""
+        key = hashlib.blake2b(f"{image_path}|{stat.st_mtime_ns}|{stat.st_size}|{max_size}|{quality}".encode(), digest_size=16).hexdigest()
+        return cache_dir / f"{key}.b64"
+    
+    @staticmethod
+    def _write_thumbnail_cache(cache_path: Path, thumbnail: str):
+        """Store a thumbnail atomically, so concurrent workers never see a partial file"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='ascii') as f:
+                    f.write(thumbnail)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass  # The cache is only an optimization
+    
+    def _prune_thumbnail_cache(self):
+        """Delete the least recently used thumbnails until the cache fits THUMBNAIL_CACHE_MAX_BYTES"""
+        if self._thumb_cache_dir is None:
+            return
+        try:
+            entries = []
+            for entry in os.scandir(self._thumb_cache_dir):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return  # No cache yet
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= THUMBNAIL_CACHE_MAX_BYTES:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
     
     @staticmethod
-    def image_to_base64(image_path: Path, max_size: int = 300) -> str:
+    def image_to_base64(image_path: Path, max_size: int = 300, cache_dir: Optional[Path] = None,
+                        quality: int = THUMBNAIL_QUALITY) -> str:
         """Convert image to base64 thumbnail for HTML embedding with correct EXIF orientation"""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            stat = None
+        
+        # Small JPEGs that are already thumbnail-sized are embedded as they are. Opening
+        # one only parses its header; browsers apply its EXIF orientation when displaying it
+        if stat and stat.st_size < THUMBNAIL_PASSTHROUGH_MAX_BYTES and Path(image_path).suffix.lower() in ('.jpg', '.jpeg'):
+            try:
+                data = Path(image_path).read_bytes()
+                with Image.open(BytesIO(data)) as img:
+                    if img.format == 'JPEG' and max(img.size) <= max_size:
+                        return f"data:image/jpeg;base64,{_b64encode(data)}"
+            except Exception:
+                pass  # Let the full path handle (and report) unreadable files
+        
+        cache_path = None
+        if cache_dir and stat:
+            cache_path = HTMLReportGenerator._thumbnail_cache_path(cache_dir, image_path, stat, max_size, quality)
+            try:
+                thumbnail = cache_path.read_text(encoding='ascii')
+                os.utime(cache_path)  # Mark as recently used, for pruning
+                return thumbnail
+            except OSError:
+                pass
+        
+        thumbnail = HTMLReportGenerator._make_thumbnail(image_path, max_size, quality)
+        if cache_path and thumbnail:
+            HTMLReportGenerator._write_thumbnail_cache(cache_path, thumbnail)
+        return thumbnail
+    
+    @staticmethod
+    def _make_thumbnail(image_path: Path, max_size: int, quality: int) -> str:
+        """Decode, resize and encode one thumbnail as a data URI (empty string on failure)"""
         try:
             with Image.open(image_path) as img:
-                # Apply EXIF orientation before any processing
-                # This fixes images that appear rotated incorrectly
-                try:
-                    # Get EXIF data
-                    exif = img.getexif()
-                    if exif:
-                        # EXIF orientation tag is 274 (0x0112)
-                        orientation = exif.get(274)
-                        
-                        # Apply orientation transformations
-                        if orientation == 2:
-                            img = img.transpose(Image.FLIP_LEFT_RIGHT)
-                        elif orientation == 3:
-                            img = img.rotate(180, expand=True)
-                        elif orientation == 4:
-                            img = img.transpose(Image.FLIP_TOP_BOTTOM)
-                        elif orientation == 5:
-                            img = img.transpose(Image.FLIP_LEFT_RIGHT).rotate(270, expand=True)
-                        elif orientation == 6:
-                            img = img.rotate(270, expand=True)
-                        elif orientation == 7:
-                            img = img.transpose(Image.FLIP_LEFT_RIGHT).rotate(90, expand=True)
-                        elif orientation == 8:
-                            img = img.rotate(90, expand=True)
-                except (AttributeError, KeyError, IndexError):
-                    # No EXIF data or no orientation tag, continue without rotation
-                    pass
+                # Let libjpeg decode JPEGs at a reduced scale, still at least twice
+                # the thumbnail size so LANCZOS has detail to work with (no-op for other formats)
+                img.draft('RGB', (max_size * 2, max_size * 2))
                 
                 # Convert to RGB if necessary
                 if img.mode not in ('RGB', 'RGBA'):
@@ -70,15 +246,64 @@ class HTMLReportGenerator:
                 # Create thumbnail
                 img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
                 
-                # Convert to base64
-                buffer = BytesIO()
-                img.save(buffer, format='JPEG', quality=85)
-                img_str = base64.b64encode(buffer.getvalue()).decode()
+                # Apply EXIF orientation so images don't appear rotated incorrectly.
+                # The bounding box is square, so doing this after thumbnailing gives
+                # the same result while only moving the thumbnail's pixels
+                ImageOps.exif_transpose(img, in_place=True)
+                
+                # Convert to base64, encoding into this thread's buffer. It is only
+                # rewound, not truncated: bytes past tell() are never read
+                buffer = getattr(_thumbnail_buffers, 'buffer', None)
+                if buffer is None:
+                    buffer = _thumbnail_buffers.buffer = BytesIO(bytes(THUMBNAIL_BUFFER_SIZE))
+                buffer.seek(0)
+                img.save(buffer, format='JPEG', quality=quality, subsampling=2)
+                img_str = _b64encode(buffer.getbuffer()[:buffer.tell()])
                 return f"data:image/jpeg;base64,{img_str}"
         except Exception as e:
             print(f"{Fore.YELLOW}Warning: Could not create thumbnail for {image_path}: {e}")
             return ""
     
+    @staticmethod
+    def iter_thumbnails(image_paths: List[Path], max_size: int = 300, cache_dir: Optional[Path] = None,
+                        quality: int = THUMBNAIL_QUALITY) -> Iterator[str]:
+        """
+        Yield image_to_base64 results for image_paths, in order
+        
+        Thumbnails are generated in parallel worker processes (threads for
+        small reports), at most THUMBNAIL_PREFETCH per worker ahead of the
+        consumer, so a large report never holds more than a window of them in memory.
+        """
+        workers = min(THUMBNAIL_MAX_WORKERS, len(image_paths))
+        if len(image_paths) >= THUMBNAIL_POOL_MIN_IMAGES and workers > 1:
+            executor_class = ProcessPoolExecutor
+        else:
+            executor_class = ThreadPoolExecutor
+            workers = min(THUMBNAIL_THREAD_WORKERS, len(image_paths))
+        remaining = iter(image_paths)
+        pending = deque()  # (path, future) in submission order
+        if workers:
+            try:
+                with executor_class(max_workers=workers) as executor:
+                    for path in remaining:
+                        pending.append((path, executor.submit(HTMLReportGenerator.image_to_base64, path, max_size, cache_dir, quality)))
+                        if len(pending) >= workers * THUMBNAIL_PREFETCH:
+                            thumbnail = pending[0][1].result()
+                            pending.popleft()
+                            yield thumbnail
+                    while pending:
+                        thumbnail = pending[0][1].result()
+                        pending.popleft()
+                        yield thumbnail
+            except (OSError, RuntimeError, BrokenProcessPool) as e:
+                print(f"{Fore.YELLOW}Warning: Thumbnail workers failed, continuing without them: {e}")
+        
+        # Whatever the workers didn't finish
+        for path, _ in pending:
+            yield HTMLReportGenerator.image_to_base64(path, max_size, cache_dir, quality)
+        for path in remaining:
+            yield HTMLReportGenerator.image_to_base64(path, max_size, cache_dir, quality)
+    
     def generate(self, groups_data: List[dict]) -> str:
         """
         Generate HTML report showing groups and deletions
@@ -87,417 +312,52 @@ class HTMLReportGenerator:
             groups_data: List of dicts with keys:
                 - 'keep': tuple (path, quality_dict)
                 - 'delete': list of tuples [(path, quality_dict), ...]
+        
+        Returns:
+            HTML content as string
+        """
+        out = StringIO()
+        self.write(groups_data, out)
+        return out.getvalue()
+    
+    def write(self, groups_data: List[dict], out: TextIO):
+        """
+        Write the HTML report showing groups and deletions to out
+        
+        Same report as generate(), but streamed, so thumbnails don't all have
+        to be held in memory at once.
         """
         print(f"{Fore.CYAN}Generating HTML report...")
         
-        # Calculate statistics
-        total_files_to_delete = sum(len(g['delete']) for g in groups_data)
-        total_space_saved = sum(
-            sum(img[0].stat().st_size for img in g['delete'])
-            for g in groups_data
-        )
-        total_images = sum(len(g['delete']) + 1 for g in groups_data)
+        # Every image in the report, and its size (stat each file once)
+        all_paths = [path for g in groups_data for path, _ in [g['keep'], *g['delete']]]
+        sizes = {path: path.stat().st_size for path in dict.fromkeys(all_paths)}
         
-        html_parts = []
+        # Calculate statistics in one pass, keeping each group's space for its header
+        total_files_to_delete = total_images = total_space_saved = 0
+        group_spaces = []
+        for g in groups_data:
+            total_files_to_delete += len(g['delete'])
+            total_images += len(g['delete']) + 1
+            group_space = sum(sizes[img[0]] for img in g['delete'])
+            group_spaces.append(group_space)
+            total_space_saved += group_space
+        
+        # Human-readable sizes, formatted together up front
+        size_labels = dict(zip(sizes, self.format_sizes(sizes.values())))
+        space_labels = self.format_sizes(group_spaces)
+        
+        thumbnails = self.iter_thumbnails(all_paths, cache_dir=self._thumb_cache_dir, quality=self.thumb_quality)
         
         # HTML header with CSS
-        html_parts.append(f"""<!DOCTYPE html>
+        out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Photo Cleaner Report</title>
     <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 16px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }}
-        
-        .header .timestamp {{
-            opacity: 0.9;
-            font-size: 1.1em;
-        }}
-        
-        .summary {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            padding: 40px;
-            background: #f8f9fa;
-            border-bottom: 2px solid #e9ecef;
-        }}
-        
-        .summary-card {{
-            background: white;
-            padding: 24px;
-            border-radius: 12px;
-            text-align: center;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            transition: transform 0.2s;
-        }}
-        
-        .summary-card:hover {{
-            transform: translateY(-4px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }}
-        
-        .summary-card .number {{
-            font-size: 2.5em;
-            font-weight: 700;
-            color: #667eea;
-            margin-bottom: 8px;
-        }}
-        
-        .summary-card .label {{
-            color: #6c757d;
-            font-size: 0.95em;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        
-        .groups {{
-            padding: 40px;
-        }}
-        
-        .group {{
-            background: white;
-            border: 2px solid #e9ecef;
-            border-radius: 12px;
-            margin-bottom: 30px;
-            overflow: hidden;
-            transition: box-shadow 0.2s;
-        }}
-        
-        .group:hover {{
-            box-shadow: 0 4px 16px rgba(0,0,0,0.1);
-        }}
-        
-        .group-header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px 30px;
-            font-size: 1.3em;
-            font-weight: 600;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .delete-group-btn {{
-            background: #dc3545;
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.75em;
-            font-weight: 600;
-            transition: all 0.2s;
-        }}
-        
-        .delete-group-btn:hover {{
-            background: #c82333;
-            transform: scale(1.05);
-        }}
-        
-        .group-warning-badge {{
-            background: #ff9800;
-            color: white;
-            padding: 8px 16px;
-            border-radius: 6px;
-            font-size: 0.75em;
-            font-weight: 700;
-            animation: pulse 2s infinite;
-        }}
-        
-        @keyframes pulse {{
-            0%, 100% {{
-                opacity: 1;
-            }}
-            50% {{
-                opacity: 0.7;
-            }}
-        }}
-        
-        .group-content {{
-            padding: 30px;
-        }}
-        
-        .image-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
-            gap: 24px;
-            margin-top: 20px;
-        }}
-        
-        .image-card {{
-            background: white;
-            border: 3px solid #e9ecef;
-            border-radius: 12px;
-            overflow: hidden;
-            transition: all 0.3s;
-        }}
-        
-        .image-card.keep {{
-            border-color: #28a745;
-            box-shadow: 0 4px 12px rgba(40, 167, 69, 0.2);
-        }}
-        
-        .image-card.delete {{
-            border-color: #dc3545;
-            opacity: 0.85;
-        }}
-        
-        .image-card:hover {{
-            transform: scale(1.02);
-        }}
-        
-        .image-header {{
-            padding: 12px;
-            font-weight: 600;
-            color: white;
-            text-align: center;
-            font-size: 0.95em;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        
-        .image-card.keep .image-header {{
-            background: #28a745;
-        }}
-        
-        .image-card.delete .image-header {{
-            background: #dc3545;
-        }}
-        
-        .image-thumbnail {{
-            width: 100%;
-            height: 200px;
-            object-fit: contain;
-            background: #f8f9fa;
-            transition: transform 0.3s ease;
-        }}
-        
-        .image-thumbnail.rotated-90 {{
-            transform: rotate(90deg);
-        }}
-        
-        .image-thumbnail.rotated-180 {{
-            transform: rotate(180deg);
-        }}
-        
-        .image-thumbnail.rotated-270 {{
-            transform: rotate(270deg);
-        }}
-        
-        .image-info {{
-            padding: 16px;
-            background: #f8f9fa;
-        }}
-        
-        .image-filename {{
-            font-size: 0.85em;
-            color: #495057;
-            margin-bottom: 12px;
-            word-break: break-all;
-            font-weight: 500;
-        }}
-        
-        .image-stats {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 8px;
-            font-size: 0.8em;
-        }}
-        
-        .stat {{
-            padding: 6px 10px;
-            background: white;
-            border-radius: 6px;
-            display: flex;
-            justify-content: space-between;
-        }}
-        
-        .stat-label {{
-            color: #6c757d;
-            font-weight: 500;
-        }}
-        
-        .stat-value {{
-            color: #212529;
-            font-weight: 600;
-        }}
-        
-        .score-badge {{
-            display: inline-block;
-            padding: 8px 16px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border-radius: 20px;
-            font-weight: 700;
-            font-size: 1.1em;
-            margin-top: 8px;
-        }}
-        
-        .footer {{
-            background: #212529;
-            color: white;
-            padding: 20px;
-            text-align: center;
-            font-size: 0.9em;
-        }}
-        
-        .warning-banner {{
-            background: #fff3cd;
-            border: 2px solid #ffc107;
-            border-radius: 8px;
-            padding: 16px 24px;
-            margin-bottom: 20px;
-            color: #856404;
-            font-weight: 500;
-        }}
-        
-        .action-buttons {{
-            position: sticky;
-            top: 20px;
-            z-index: 1000;
-            background: white;
-            padding: 20px;
-            border-radius: 12px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-            margin-bottom: 20px;
-            display: flex;
-            gap: 12px;
-            flex-wrap: wrap;
-        }}
-        
-        .btn {{
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            font-size: 1em;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        
-        .btn:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-        }}
-        
-        .btn-primary {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }}
-        
-        .btn-warning {{
-            background: #ffc107;
-            color: #856404;
-        }}
-        
-        .toggle-btn {{
-            position: absolute;
-            top: 10px;
-            right: 10px;
-            padding: 8px 16px;
-            background: #6c757d;
-            color: white;
-            border: none;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.85em;
-            font-weight: 600;
-            transition: all 0.2s;
-            z-index: 10;
-        }}
-        
-        .toggle-btn:hover {{
-            background: #5a6268;
-            transform: scale(1.05);
-        }}
-        
-        .image-card.keep .toggle-btn {{
-            background: #dc3545;
-        }}
-        
-        .image-card.delete .toggle-btn {{
-            background: #28a745;
-        }}
-        
-        .rotate-btn {{
-            position: absolute;
-            top: 10px;
-            left: 10px;
-            padding: 8px 12px;
-            background: #17a2b8;
-            color: white;
-            border: none;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.85em;
-            font-weight: 600;
-            transition: all 0.2s;
-            z-index: 10;
-        }}
-        
-        .rotate-btn:hover {{
-            background: #138496;
-            transform: scale(1.05);
-        }}
-        
-        .modified-badge {{
-            position: absolute;
-            top: 50px;
-            right: 10px;
-            background: #ff9800;
-            color: white;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 0.75em;
-            font-weight: 700;
-        }}
-        
-        @media (max-width: 768px) {{
-            .image-grid {{
-                grid-template-columns: 1fr;
-            }}
-            
-            .header h1 {{
-                font-size: 1.8em;
-            }}
-        }}
-    </style>
+{_REPORT_CSS}    </style>
 </head>
 <body>
     <div class="container">
@@ -529,7 +389,7 @@ class HTMLReportGenerator:
 """)
         
         if self.dry_run:
-            html_parts.append("""
+            out.write("""
             <div class="warning-banner">
                 ⚠️ <strong>DRY RUN MODE:</strong> This is a preview. You can modify the keep/delete decisions below, then export and run with --apply-decisions.
             </div>
@@ -549,362 +409,67 @@ class HTMLReportGenerator:
 """)
         
         # Process each group
-        for idx, group_data in enumerate(groups_data, 1):
+        for idx, (group_data, space_label) in enumerate(zip(groups_data, space_labels), 1):
             keep_path, keep_quality = group_data['keep']
             to_delete = group_data['delete']
-            group_space = sum(img[0].stat().st_size for img in to_delete)
             
-            html_parts.append(f"""
-            <div class="group" data-group="{idx}">
-                <div class="group-header">
-                    <span>Group {idx} of {len(groups_data)}</span>
-                    <div style="display: flex; align-items: center; gap: 20px;">
-                        <span>{len(to_delete) + 1} similar images • {self.format_size(group_space)} to save</span>
-                        <button class="delete-group-btn" onclick="deleteEntireGroup({idx})" title="Mark all images in this group for deletion">
-                            🗑️ Delete Entire Group
-                        </button>
-                    </div>
-                </div>
-                <div class="group-content">
-                    <div class="image-grid">
-""")
+            out.write(_GROUP_HEADER_TEMPLATE.format_map({
+                'idx': idx,
+                'group_count': len(groups_data),
+                'image_count': len(to_delete) + 1,
+                'space': space_label,
+            }))
             
             # Add best image (to keep)
-            keep_thumbnail = self.image_to_base64(keep_path)
-            
-            # Use cloud path for data-path if available, otherwise use local path
-            keep_data_path = keep_quality.get('cloud_path') or keep_quality.get('dropbox_path', keep_path)
-            keep_cloud_id = keep_quality.get('cloud_id', '')
-            
-            html_parts.append(f"""
-                        <div class="image-card keep" data-path="{keep_data_path}" data-id="{keep_cloud_id}" data-group="{idx}" data-size="{keep_path.stat().st_size}">
-                            <button class="rotate-btn" onclick="rotateImage(this)" title="Rotate 90°">↻</button>
-                            <button class="toggle-btn" onclick="toggleKeepDelete(this)">Change to Delete</button>
-                            <div class="image-header">✓ Keep</div>
-                            {f'<img class="image-thumbnail" src="{keep_thumbnail}" alt="{keep_path.name}" data-rotation="0">' if keep_thumbnail else ''}
-                            <div class="image-info">
-                                <div class="image-filename">{keep_path.name}</div>
-                                <div class="image-stats">
-                                    <div class="stat">
-                                        <span class="stat-label">Resolution:</span>
-                                        <span class="stat-value">{keep_quality['resolution']:.2f} MP</span>
-                                    </div>
-                                    <div class="stat">
-                                        <span class="stat-label">Size:</span>
-                                        <span class="stat-value">{self.format_size(keep_path.stat().st_size)}</span>
-                                    </div>
-                                    <div class="stat">
-                                        <span class="stat-label">Sharpness:</span>
-                                        <span class="stat-value">{keep_quality['sharpness']:.1f}</span>
-                                    </div>
-                                </div>
-                                <div style="text-align: center;">
-                                    <span class="score-badge">Score: {keep_quality['score']:.2f}</span>
-                                </div>
-                            </div>
-                        </div>
-""")
+            out.write(self._image_card(
+                idx, keep_path, keep_quality, next(thumbnails), sizes[keep_path], size_labels[keep_path],
+                action='keep', toggle_label='Change to Delete', header='✓ Keep'))
             
             # Add images to delete
             for img_path, quality in to_delete:
-                thumbnail = self.image_to_base64(img_path)
-                
-                # Use cloud path for data-path if available, otherwise use local path
-                img_data_path = quality.get('cloud_path') or quality.get('dropbox_path', img_path)
-                img_cloud_id = quality.get('cloud_id', '')
-                
-                html_parts.append(f"""
-                        <div class="image-card delete" data-path="{img_data_path}" data-id="{img_cloud_id}" data-group="{idx}" data-size="{img_path.stat().st_size}">
-                            <button class="rotate-btn" onclick="rotateImage(this)" title="Rotate 90°">↻</button>
-                            <button class="toggle-btn" onclick="toggleKeepDelete(this)">Change to Keep</button>
-                            <div class="image-header">✗ Delete</div>
-                            {f'<img class="image-thumbnail" src="{thumbnail}" alt="{img_path.name}" data-rotation="0">' if thumbnail else ''}
-                            <div class="image-info">
-                                <div class="image-filename">{img_path.name}</div>
-                                <div class="image-stats">
-                                    <div class="stat">
-                                        <span class="stat-label">Resolution:</span>
-                                        <span class="stat-value">{quality['resolution']:.2f} MP</span>
-                                    </div>
-                                    <div class="stat">
-                                        <span class="stat-label">Size:</span>
-                                        <span class="stat-value">{self.format_size(img_path.stat().st_size)}</span>
-                                    </div>
-                                    <div class="stat">
-                                        <span class="stat-label">Sharpness:</span>
-                                        <span class="stat-value">{quality['sharpness']:.1f}</span>
-                                    </div>
-                                </div>
-                                <div style="text-align: center;">
-                                    <span class="score-badge">Score: {quality['score']:.2f}</span>
-                                </div>
-                            </div>
-                        </div>
-""")
+                out.write(self._image_card(
+                    idx, img_path, quality, next(thumbnails), sizes[img_path], size_labels[img_path],
+                    action='delete', toggle_label='Change to Keep', header='✗ Delete'))
             
-            html_parts.append("""
-                    </div>
-                </div>
-            </div>
-""")
+            out.write(_GROUP_FOOTER)
         
         # Footer
-        html_parts.append(f"""
+        out.write(f"""
         </div>
         
         <div class="footer">
-            Generated by Photo Cleaner • Directory: {self.directory} • Threshold: {self.threshold}
+            Generated by Photo Cleaner • Directory: {escape(str(self.directory))} • Threshold: {self.threshold}
         </div>
     </div>
     
     <script>
-        // Track original decisions and modifications
-        const originalDecisions = {{}};
-        const modifiedGroups = new Set();
-        
-        // Initialize original decisions on page load
-        document.addEventListener('DOMContentLoaded', function() {{
-            document.querySelectorAll('.image-card').forEach(card => {{
-                const path = card.getAttribute('data-path');
-                const group = card.getAttribute('data-group');
-                const action = card.classList.contains('keep') ? 'keep' : 'delete';
-                
-                if (!originalDecisions[group]) {{
-                    originalDecisions[group] = {{}};
-                }}
-                originalDecisions[group][path] = action;
-            }});
-        }});
-        
-        function rotateImage(button) {{
-            const card = button.closest('.image-card');
-            const img = card.querySelector('.image-thumbnail');
-            
-            if (!img) return;
-            
-            // Get current rotation (default to 0)
-            let currentRotation = parseInt(img.getAttribute('data-rotation') || '0');
-            
-            // Increment rotation by 90 degrees
-            currentRotation = (currentRotation + 90) % 360;
-            
-            // Update the data attribute
-            img.setAttribute('data-rotation', currentRotation);
-            
-            // Remove all rotation classes
-            img.classList.remove('rotated-90', 'rotated-180', 'rotated-270');
-            
-            // Apply the appropriate rotation class
-            if (currentRotation === 90) {{
-                img.classList.add('rotated-90');
-            }} else if (currentRotation === 180) {{
-                img.classList.add('rotated-180');
-            }} else if (currentRotation === 270) {{
-                img.classList.add('rotated-270');
-            }}
-        }}
-        
-        function deleteEntireGroup(groupId) {{
-            if (!confirm(`Are you sure you want to mark all images in Group ${{groupId}} for deletion?`)) {{
-                return;
-            }}
-            
-            // Find all cards in this group
-            const groupCards = document.querySelectorAll(`[data-group="${{groupId}}"]`);
-            
-            // Mark all as delete
-            groupCards.forEach(card => {{
-                if (card.classList.contains('image-card')) {{
-                    const header = card.querySelector('.image-header');
-                    const button = card.querySelector('.toggle-btn');
-                    
-                    // Change to delete state
-                    card.classList.remove('keep');
-                    card.classList.add('delete');
-                    header.textContent = '✗ Delete';
-                    button.textContent = 'Change to Keep';
-                    
-                    // Add modified badge
-                    if (!card.querySelector('.modified-badge')) {{
-                        const badge = document.createElement('div');
-                        badge.className = 'modified-badge';
-                        badge.textContent = 'MODIFIED';
-                        card.appendChild(badge);
-                    }}
-                }}
-            }});
-            
-            // Mark group as modified
-            modifiedGroups.add(String(groupId));
-            updateModifiedCount();
-            updateGroupWarnings(groupId);
-        }}
-        
-        function toggleKeepDelete(button) {{
-            const card = button.closest('.image-card');
-            const group = card.getAttribute('data-group');
-            const path = card.getAttribute('data-path');
-            const header = card.querySelector('.image-header');
-            
-            // Toggle the state
-            if (card.classList.contains('keep')) {{
-                card.classList.remove('keep');
-                card.classList.add('delete');
-                header.textContent = '✗ Delete';
-                button.textContent = 'Change to Keep';
-            }} else {{
-                card.classList.remove('delete');
-                card.classList.add('keep');
-                header.textContent = '✓ Keep';
-                button.textContent = 'Change to Delete';
-            }}
-            
-            // Add modified badge if not already there
-            if (!card.querySelector('.modified-badge')) {{
-                const badge = document.createElement('div');
-                badge.className = 'modified-badge';
-                badge.textContent = 'MODIFIED';
-                card.appendChild(badge);
-            }}
-            
-            // Track modification
-            const currentAction = card.classList.contains('keep') ? 'keep' : 'delete';
-            if (originalDecisions[group][path] !== currentAction) {{
-                modifiedGroups.add(group);
-            }} else {{
-                // Check if any other files in this group are still modified
-                let groupStillModified = false;
-                for (const [p, origAction] of Object.entries(originalDecisions[group])) {{
-                    const otherCard = document.querySelector(`[data-path="${{p}}"]`);
-                    const currentOtherAction = otherCard.classList.contains('keep') ? 'keep' : 'delete';
-                    if (origAction !== currentOtherAction) {{
-                        groupStillModified = true;
-                        break;
-                    }}
-                }}
-                if (!groupStillModified) {{
-                    modifiedGroups.delete(group);
-                    card.querySelector('.modified-badge')?.remove();
-                }}
-            }}
-            
-            updateModifiedCount();
-            updateGroupWarnings(group);
-        }}
-        
-        function updateGroupWarnings(groupId) {{
-            // Check if all images in this group are marked for deletion
-            const groupCards = document.querySelectorAll(`.image-card[data-group="${{groupId}}"]`);
-            const keepCount = Array.from(groupCards).filter(c => c.classList.contains('keep')).length;
-            
-            // Find the group container
-            const groupContainer = document.querySelector(`.group[data-group="${{groupId}}"]`);
-            if (!groupContainer) return;
-            
-            const groupHeader = groupContainer.querySelector('.group-header');
-            let warningBadge = groupHeader.querySelector('.group-warning-badge');
-            
-            if (keepCount === 0) {{
-                // All images marked for deletion - show warning
-                if (!warningBadge) {{
-                    warningBadge = document.createElement('span');
-                    warningBadge.className = 'group-warning-badge';
-                    warningBadge.textContent = '⚠️ ENTIRE GROUP WILL BE DELETED';
-                    groupHeader.appendChild(warningBadge);
-                }}
-            }} else {{
-                // At least one image to keep - remove warning
-                if (warningBadge) {{
-                    warningBadge.remove();
-                }}
-            }}
-        }}
-        
-        function updateModifiedCount() {{
-            document.getElementById('modifiedCount').textContent = modifiedGroups.size;
-        }}
-        
-        function resetDecisions() {{
-            if (!confirm('Reset all changes to original AI decisions?')) {{
-                return;
-            }}
-            
-            document.querySelectorAll('.image-card').forEach(card => {{
-                const path = card.getAttribute('data-path');
-                const group = card.getAttribute('data-group');
-                const originalAction = originalDecisions[group][path];
-                const header = card.querySelector('.image-header');
-                const button = card.querySelector('.toggle-btn');
-                
-                card.classList.remove('keep', 'delete');
-                card.classList.add(originalAction);
-                
-                if (originalAction === 'keep') {{
-                    header.textContent = '✓ Keep';
-                    button.textContent = 'Change to Delete';
-                }} else {{
-                    header.textContent = '✗ Delete';
-                    button.textContent = 'Change to Keep';
-                }}
-                
-                card.querySelector('.modified-badge')?.remove();
-            }});
-            
-            modifiedGroups.clear();
-            updateModifiedCount();
-            
-            // Update all group warnings
-            const allGroups = new Set();
-            document.querySelectorAll('.image-card').forEach(card => {{
-                allGroups.add(card.getAttribute('data-group'));
-            }});
-            allGroups.forEach(groupId => updateGroupWarnings(groupId));
-        }}
-        
-        function saveDecisions() {{
-            const decisions = {{}};
-            
-            document.querySelectorAll('.image-card').forEach(card => {{
-                const path = card.getAttribute('data-path');
-                const cloudId = card.getAttribute('data-id');
-                const group = card.getAttribute('data-group');
-                const size = parseInt(card.getAttribute('data-size')) || 0;
-                const action = card.classList.contains('keep') ? 'keep' : 'delete';
-                
-                if (!decisions[group]) {{
-                    decisions[group] = {{keep: [], delete: []}};
-                }}
-                
-                // Store path, size, and cloud_id (for OneDrive) as an object
-                const item = {{path: path, size: size}};
-                if (cloudId) {{
-                    item.cloud_id = cloudId;
-                }}
-                decisions[group][action].push(item);
-            }});
-            
-            // Create JSON file
-            const dataStr = JSON.stringify(decisions, null, 2);
-            const dataBlob = new Blob([dataStr], {{type: 'application/json'}});
-            const url = URL.createObjectURL(dataBlob);
-            
-            // Create download link
-            const link = document.createElement('a');
-            link.href = url;
-            link.download = 'photo_decisions.json';
-            document.body.appendChild(link);
-            link.click();
-            document.body.removeChild(link);
-            URL.revokeObjectURL(url);
-            
-            alert('Decisions saved to photo_decisions.json!\\n\\nTo apply these decisions, run:\\npython photocleaner.py --apply-decisions photo_decisions.json --execute');
-        }}
-    </script>
+{_REPORT_JS}    </script>
 </body>
 </html>
 """)
-        
-        return ''.join(html_parts)
+        self._prune_thumbnail_cache()
+    
+    def _image_card(self, idx: int, image_path: Path, quality: dict, thumbnail: str, size: int, size_label: str,
+                    action: str, toggle_label: str, header: str) -> str:
+        """HTML for one keep/delete image card in group idx"""
+        # File names and paths can contain quotes, & or <, so escape them once here
+        name = escape(image_path.name)
+        return _IMAGE_CARD_TEMPLATE.format_map({
+            'action': action,
+            # Use cloud path for data-path if available, otherwise use local path
+            'data_path': escape(str(quality.get('cloud_path') or quality.get('dropbox_path', image_path))),
+            'cloud_id': escape(str(quality.get('cloud_id', ''))),
+            'idx': idx,
+            'size_bytes': size,
+            'toggle_label': toggle_label,
+            'header': header,
+            'thumbnail_tag': f'<img class="image-thumbnail" src="{thumbnail}" alt="{name}" data-rotation="0">' if thumbnail else '',
+            'name': name,
+            'resolution': quality['resolution'],
+            'size': size_label,
+            'sharpness': quality['sharpness'],
+            'score': quality['score'],
+        })
     
     def save(self, groups_data: List[dict], output_path: Path, photo_metadata: dict = None) -> bool:
         """
@@ -923,9 +488,7 @@ class HTMLReportGenerator:
             if photo_metadata:
                 groups_data = self._replace_with_cloud_paths(groups_data, photo_metadata)
             
-            html_content = self.generate(groups_data)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self._write_file(output_path, lambda f: self.write(groups_data, f))
             print(f"{Fore.GREEN}HTML report saved to: {output_path}")
             return True
         except Exception as e:
@@ -942,161 +505,29 @@ class HTMLReportGenerator:
         Returns:
             HTML content as string
         """
+        out = StringIO()
+        self.write_all_photos_report(image_paths, out)
+        return out.getvalue()
+    
+    def write_all_photos_report(self, image_paths: List[Path], out: TextIO):
+        """Write the all-photos gallery report to out, streaming thumbnails as they are made"""
         print(f"{Fore.CYAN}Generating gallery of all photos found...")
         
         # Calculate statistics
         total_images = len(image_paths)
-        total_size = sum(img.stat().st_size for img in image_paths)
+        sizes = {img: img.stat().st_size for img in dict.fromkeys(image_paths)}
+        total_size = sum(sizes[img] for img in image_paths)
+        size_labels = dict(zip(sizes, self.format_sizes(sizes.values())))
         
         # Start building HTML
-        html_parts = []
-        html_parts.append(f"""<!DOCTYPE html>
+        out.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Photo Cleaner - All Photos Found</title>
     <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            min-height: 100vh;
-        }}
-        
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            padding: 40px;
-        }}
-        
-        .header {{
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 30px;
-            border-bottom: 3px solid #667eea;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            color: #2d3748;
-            margin-bottom: 10px;
-        }}
-        
-        .header .subtitle {{
-            font-size: 1.2em;
-            color: #718096;
-        }}
-        
-        .stats {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 40px;
-        }}
-        
-        .stat-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 25px;
-            border-radius: 15px;
-            text-align: center;
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-        }}
-        
-        .stat-card .number {{
-            font-size: 2.5em;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        
-        .stat-card .label {{
-            font-size: 1em;
-            opacity: 0.9;
-        }}
-        
-        .info-box {{
-            background: #e6fffa;
-            border-left: 4px solid #38b2ac;
-            padding: 20px;
-            margin-bottom: 30px;
-            border-radius: 8px;
-        }}
-        
-        .info-box h3 {{
-            color: #234e52;
-            margin-bottom: 10px;
-        }}
-        
-        .info-box p {{
-            color: #2c7a7b;
-            line-height: 1.6;
-        }}
-        
-        .gallery {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
-            gap: 20px;
-            margin-top: 30px;
-        }}
-        
-        .photo-card {{
-            background: #f7fafc;
-            border: 2px solid #e2e8f0;
-            border-radius: 12px;
-            padding: 15px;
-            transition: all 0.3s ease;
-            cursor: pointer;
-        }}
-        
-        .photo-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-            border-color: #667eea;
-        }}
-        
-        .photo-card img {{
-            width: 100%;
-            height: 200px;
-            object-fit: cover;
-            border-radius: 8px;
-            margin-bottom: 10px;
-        }}
-        
-        .photo-info {{
-            font-size: 0.9em;
-        }}
-        
-        .photo-name {{
-            font-weight: 600;
-            color: #2d3748;
-            margin-bottom: 5px;
-            word-break: break-word;
-        }}
-        
-        .photo-size {{
-            color: #718096;
-            font-size: 0.85em;
-        }}
-        
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 2px solid #e2e8f0;
-            text-align: center;
-            color: #718096;
-            font-size: 0.9em;
-        }}
-    </style>
+{_GALLERY_CSS}    </style>
 </head>
 <body>
     <div class="container">
@@ -1130,17 +561,19 @@ class HTMLReportGenerator:
 """)
         
         # Add each photo
+        thumbnails = self.iter_thumbnails(image_paths, max_size=250, cache_dir=self._thumb_cache_dir,
+                                         quality=self.thumb_quality)
         for img_path in image_paths:
+            thumbnail = next(thumbnails)
             try:
-                file_size = img_path.stat().st_size
-                thumbnail = self.image_to_base64(img_path, max_size=250)
+                name = escape(img_path.name)
                 
-                html_parts.append(f"""
+                out.write(f"""
             <div class="photo-card">
-                <img src="{thumbnail}" alt="{img_path.name}" loading="lazy">
+                <img src="{thumbnail}" alt="{name}" loading="lazy">
                 <div class="photo-info">
-                    <div class="photo-name" title="{img_path.name}">{img_path.name}</div>
-                    <div class="photo-size">{self.format_size(file_size)}</div>
+                    <div class="photo-name" title="{name}">{name}</div>
+                    <div class="photo-size">{size_labels[img_path]}</div>
                 </div>
             </div>
 """)
@@ -1148,7 +581,7 @@ class HTMLReportGenerator:
                 print(f"{Fore.YELLOW}Warning: Could not add {img_path.name} to report: {e}")
         
         # Close HTML
-        html_parts.append("""
+        out.write("""
         </div>
         
         <div class="footer">
@@ -1159,8 +592,7 @@ class HTMLReportGenerator:
 </body>
 </html>
 """)
-        
-        return ''.join(html_parts)
+        self._prune_thumbnail_cache()
     
     def save_all_photos_report(self, image_paths: List[Path], output_path: Path) -> bool:
         """
@@ -1174,15 +606,30 @@ class HTMLReportGenerator:
             True if successful, False otherwise
         """
         try:
-            html_content = self.generate_all_photos_report(image_paths)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self._write_file(output_path, lambda f: self.write_all_photos_report(image_paths, f))
             print(f"{Fore.GREEN}Gallery report saved to: {output_path}")
             return True
         except Exception as e:
             print(f"{Fore.RED}Error saving gallery report: {e}")
             return False
     
+    @staticmethod
+    def _write_file(output_path: Path, write):
+        """
+        Stream a report into output_path via write(file)
+        
+        The report goes to a temporary file that replaces output_path only
+        once it is complete, so a failure never leaves a truncated report.
+        """
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write(f)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    
     def _replace_with_cloud_paths(self, groups_data: List[dict], photo_metadata: dict) -> List[dict]:
         """Replace temp file paths with cloud paths (Dropbox/OneDrive) for cloud mode"""
         updated_groups = []
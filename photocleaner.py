@@ -796,7 +796,9 @@ class PhotoCleaner:
             # Generate gallery report showing all photos found
             report_path = self.storage.directory if isinstance(self.storage, LocalStorageProvider) else Path.cwd()
             report_file = report_path / 'photo_cleaner_report.html'
-            report_generator = HTMLReportGenerator(report_path, self.threshold, self.dry_run)
+            # Cloud photos are temporary downloads, so cached thumbnails would never be reused
+            report_generator = HTMLReportGenerator(report_path, self.threshold, self.dry_run,
+                                                   thumbnail_cache=isinstance(self.storage, LocalStorageProvider))
             
             if report_generator.save_all_photos_report(images, report_file):
                 file_url = f"file://{report_file.resolve()}"
@@ -830,7 +832,9 @@ class PhotoCleaner:
             # Generate report
             report_path = self.storage.directory if isinstance(self.storage, LocalStorageProvider) else Path.cwd()
             report_file = report_path / 'photo_cleaner_report.html'
-            report_generator = HTMLReportGenerator(report_path, self.threshold, self.dry_run)
+            # Cloud photos are temporary downloads, so cached thumbnails would never be reused
+            report_generator = HTMLReportGenerator(report_path, self.threshold, self.dry_run,
+                                                   thumbnail_cache=isinstance(self.storage, LocalStorageProvider))
             
             # Pass photo metadata if available (for cloud providers)
             photo_metadata = self.storage.photo_metadata if not isinstance(self.storage, LocalStorageProvider) else None
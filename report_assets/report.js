@@ -0,0 +1,234 @@
+        // Track original decisions and modifications
+        const originalDecisions = {};
+        const modifiedGroups = new Set();
+        
+        // Every image card, group id and each group's cards, collected once (cards are never added or removed)
+        let imageCards = [];
+        const groupIds = new Set();
+        const cardsByGroup = new Map();
+        
+        // Initialize original decisions on page load
+        document.addEventListener('DOMContentLoaded', function() {
+            imageCards = Array.from(document.querySelectorAll('.image-card'));
+            imageCards.forEach(card => {
+                const path = card.getAttribute('data-path');
+                const group = card.getAttribute('data-group');
+                const action = card.classList.contains('keep') ? 'keep' : 'delete';
+                
+                if (!originalDecisions[group]) {
+                    originalDecisions[group] = {};
+                }
+                originalDecisions[group][path] = action;
+                groupIds.add(group);
+                (cardsByGroup.get(group) ?? cardsByGroup.set(group, []).get(group)).push(card);
+            });
+        });
+        
+        function rotateImage(button) {
+            const card = button.closest('.image-card');
+            const img = card.querySelector('.image-thumbnail');
+            
+            if (!img) return;
+            
+            // Get current rotation (default to 0)
+            let currentRotation = parseInt(img.getAttribute('data-rotation') || '0');
+            
+            // Increment rotation by 90 degrees
+            currentRotation = (currentRotation + 90) % 360;
+            
+            // Update the data attribute
+            img.setAttribute('data-rotation', currentRotation);
+            
+            // Remove all rotation classes
+            img.classList.remove('rotated-90', 'rotated-180', 'rotated-270');
+            
+            // Apply the appropriate rotation class
+            if (currentRotation === 90) {
+                img.classList.add('rotated-90');
+            } else if (currentRotation === 180) {
+                img.classList.add('rotated-180');
+            } else if (currentRotation === 270) {
+                img.classList.add('rotated-270');
+            }
+        }
+        
+        function deleteEntireGroup(groupId) {
+            if (!confirm(`Are you sure you want to mark all images in Group ${groupId} for deletion?`)) {
+                return;
+            }
+            
+            // Mark all cards in this group as delete
+            (cardsByGroup.get(String(groupId)) || []).forEach(card => {
+                const header = card.querySelector('.image-header');
+                const button = card.querySelector('.toggle-btn');
+                
+                // Change to delete state
+                card.classList.remove('keep');
+                card.classList.add('delete');
+                header.textContent = '✗ Delete';
+                button.textContent = 'Change to Keep';
+                
+                // Add modified badge
+                if (!card.querySelector('.modified-badge')) {
+                    const badge = document.createElement('div');
+                    badge.className = 'modified-badge';
+                    badge.textContent = 'MODIFIED';
+                    card.appendChild(badge);
+                }
+            });
+            
+            // Mark group as modified
+            modifiedGroups.add(String(groupId));
+            updateModifiedCount();
+            updateGroupWarnings(groupId);
+        }
+        
+        function toggleKeepDelete(button) {
+            const card = button.closest('.image-card');
+            const group = card.getAttribute('data-group');
+            const path = card.getAttribute('data-path');
+            const header = card.querySelector('.image-header');
+            
+            // Toggle the state
+            if (card.classList.contains('keep')) {
+                card.classList.remove('keep');
+                card.classList.add('delete');
+                header.textContent = '✗ Delete';
+                button.textContent = 'Change to Keep';
+            } else {
+                card.classList.remove('delete');
+                card.classList.add('keep');
+                header.textContent = '✓ Keep';
+                button.textContent = 'Change to Delete';
+            }
+            
+            // Add modified badge if not already there
+            if (!card.querySelector('.modified-badge')) {
+                const badge = document.createElement('div');
+                badge.className = 'modified-badge';
+                badge.textContent = 'MODIFIED';
+                card.appendChild(badge);
+            }
+            
+            // Track modification
+            const currentAction = card.classList.contains('keep') ? 'keep' : 'delete';
+            if (originalDecisions[group][path] !== currentAction) {
+                modifiedGroups.add(group);
+            } else {
+                // Check if any other files in this group are still modified
+                const groupStillModified = cardsByGroup.get(group).some(otherCard => {
+                    const currentOtherAction = otherCard.classList.contains('keep') ? 'keep' : 'delete';
+                    return originalDecisions[group][otherCard.getAttribute('data-path')] !== currentOtherAction;
+                });
+                if (!groupStillModified) {
+                    modifiedGroups.delete(group);
+                    card.querySelector('.modified-badge')?.remove();
+                }
+            }
+            
+            updateModifiedCount();
+            updateGroupWarnings(group);
+        }
+        
+        function updateGroupWarnings(groupId, cards = cardsByGroup.get(String(groupId)) || []) {
+            // Check if all images in this group are marked for deletion
+            const keepCount = cards.filter(c => c.classList.contains('keep')).length;
+            
+            // Find the group container
+            const groupContainer = document.querySelector(`.group[data-group="${groupId}"]`);
+            if (!groupContainer) return;
+            
+            const groupHeader = groupContainer.querySelector('.group-header');
+            let warningBadge = groupHeader.querySelector('.group-warning-badge');
+            
+            if (keepCount === 0) {
+                // All images marked for deletion - show warning
+                if (!warningBadge) {
+                    warningBadge = document.createElement('span');
+                    warningBadge.className = 'group-warning-badge';
+                    warningBadge.textContent = '⚠️ ENTIRE GROUP WILL BE DELETED';
+                    groupHeader.appendChild(warningBadge);
+                }
+            } else {
+                // At least one image to keep - remove warning
+                if (warningBadge) {
+                    warningBadge.remove();
+                }
+            }
+        }
+        
+        function updateModifiedCount() {
+            document.getElementById('modifiedCount').textContent = modifiedGroups.size;
+        }
+        
+        function resetDecisions() {
+            if (!confirm('Reset all changes to original AI decisions?')) {
+                return;
+            }
+            
+            imageCards.forEach(card => {
+                const path = card.getAttribute('data-path');
+                const group = card.getAttribute('data-group');
+                const originalAction = originalDecisions[group][path];
+                const header = card.querySelector('.image-header');
+                const button = card.querySelector('.toggle-btn');
+                
+                card.classList.remove('keep', 'delete');
+                card.classList.add(originalAction);
+                
+                if (originalAction === 'keep') {
+                    header.textContent = '✓ Keep';
+                    button.textContent = 'Change to Delete';
+                } else {
+                    header.textContent = '✗ Delete';
+                    button.textContent = 'Change to Keep';
+                }
+                
+                card.querySelector('.modified-badge')?.remove();
+            });
+            
+            modifiedGroups.clear();
+            updateModifiedCount();
+            
+            // Update all group warnings
+            groupIds.forEach(groupId => updateGroupWarnings(groupId));
+        }
+        
+        function saveDecisions() {
+            const decisions = {};
+            
+            imageCards.forEach(card => {
+                const path = card.getAttribute('data-path');
+                const cloudId = card.getAttribute('data-id');
+                const group = card.getAttribute('data-group');
+                const size = parseInt(card.getAttribute('data-size')) || 0;
+                const action = card.classList.contains('keep') ? 'keep' : 'delete';
+                
+                if (!decisions[group]) {
+                    decisions[group] = {keep: [], delete: []};
+                }
+                
+                // Store path, size, and cloud_id (for OneDrive) as an object
+                const item = {path: path, size: size};
+                if (cloudId) {
+                    item.cloud_id = cloudId;
+                }
+                decisions[group][action].push(item);
+            });
+            
+            // Create JSON file
+            const dataStr = JSON.stringify(decisions, null, 2);
+            const dataBlob = new Blob([dataStr], {type: 'application/json'});
+            const url = URL.createObjectURL(dataBlob);
+            
+            // Create download link
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = 'photo_decisions.json';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+            URL.revokeObjectURL(url);
+            
+            alert('Decisions saved to photo_decisions.json!\n\nTo apply these decisions, run:\npython photocleaner.py --apply-decisions photo_decisions.json --execute');
+        }
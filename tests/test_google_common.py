@@ -0,0 +1,50 @@
+import httplib2
+import pytest
+import requests
+
+import google_common
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(google_common.time, 'sleep', lambda seconds: None)
+
+
+def flaky(error, failures):
+    """Callable that raises error `failures` times, then returns 'ok'"""
+    calls = []
+    
+    def call():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise error
+        return 'ok'
+    
+    call.calls = calls
+    return call
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ConnectionError('connection reset'),
+    requests.exceptions.ReadTimeout('read timed out'),
+    httplib2.ServerNotFoundError('no such host'),
+    ConnectionResetError('connection reset'),
+])
+def test_call_with_retry_retries_connection_errors(error):
+    call = flaky(error, failures=2)
+    assert google_common.call_with_retry(call) == 'ok'
+    assert len(call.calls) == 3
+
+
+def test_call_with_retry_gives_up_after_max_attempts():
+    call = flaky(requests.exceptions.ConnectionError('down'), failures=10)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        google_common.call_with_retry(call, max_attempts=3)
+    assert len(call.calls) == 3
+
+
+def test_call_with_retry_does_not_retry_other_errors():
+    call = flaky(ValueError('bad'), failures=1)
+    with pytest.raises(ValueError):
+        google_common.call_with_retry(call)
+    assert len(call.calls) == 1